@@ -3,9 +3,9 @@ import urlparse
 import redis
 
 from flask_kvsession import KVSessionExtension
-from simplekv.memory.redisstore import RedisStore
 
 from flask import Flask, request
+from flask_caching import Cache
 from flask_login import LoginManager
 
 import dmapiclient
@@ -14,10 +14,13 @@ from dmutils.user import User
 
 from config import configs
 
-from react.render import render_component
+from app.api_client import GuardedAPIClient, RequestCachedAPIClient
+from app import render
+from app.sessions import SessionInterface, SessionStore
 
-data_api_client = dmapiclient.DataAPIClient()
+data_api_client = RequestCachedAPIClient(GuardedAPIClient(dmapiclient.DataAPIClient()))
 login_manager = LoginManager()
+cache = Cache()
 
 from app.main.helpers.services import parse_document_upload_time  # noqa
 from app.main.helpers.frameworks import question_references  # noqa
@@ -35,34 +38,31 @@ def create_app(config_name):
         data_api_client=data_api_client,
         login_manager=login_manager,
     )
+    cache.init_app(application)
+    render.init_app(application)
+
+    if application.config['REDIS_SESSIONS'] or application.config['DM_EMAIL_OUTBOX']:
+        application.extensions['redis'] = redis.StrictRedis(**redis_options(application))
 
     if application.config['REDIS_SESSIONS']:
-        vcap_services = parse_vcap_services()
-        redis_opts = {
-            'ssl': application.config['REDIS_SSL'],
-            'ssl_ca_certs': application.config['REDIS_SSL_CA_CERTS'],
-            'ssl_cert_reqs': application.config['REDIS_SSL_HOST_REQ']
-        }
-        if vcap_services and 'redis' in vcap_services:
-            redis_opts['host'] = vcap_services['redis'][0]['credentials']['hostname']
-            redis_opts['port'] = vcap_services['redis'][0]['credentials']['port']
-            redis_opts['password'] = vcap_services['redis'][0]['credentials']['password']
-        else:
-            redis_opts['host'] = application.config['REDIS_SERVER_HOST']
-            redis_opts['port'] = application.config['REDIS_SERVER_PORT']
-            redis_opts['password'] = application.config['REDIS_SERVER_PASSWORD']
-
-        session_store = RedisStore(redis.StrictRedis(**redis_opts))
+        session_store = SessionStore(
+            application.extensions['redis'], application.permanent_session_lifetime.total_seconds()
+        )
         KVSessionExtension(session_store, application)
+        application.session_interface = SessionInterface()
 
-    from .main import main as main_blueprint
+    from .main import main as main_blueprint, content_loader
     from .status import status as status_blueprint
+    from .status import monitor as status_monitor
+
+    content_loader.warm(application.config['DM_CONTENT_WARMUP_FRAMEWORKS'])
 
     url_prefix = application.config['URL_PREFIX']
     application.register_blueprint(status_blueprint,
                                    url_prefix=url_prefix)
     application.register_blueprint(main_blueprint,
                                    url_prefix=url_prefix)
+    status_monitor.init_app(application)
     login_manager.login_message_category = "must_login"
     main_blueprint.config = application.config.copy()
 
@@ -90,11 +90,34 @@ def create_app(config_name):
         return Markup(t.render(x=x, **kwargs))
 
     application.jinja_env.filters['as'] = component_filter
-    application.jinja_env.globals.update(render_component=render_component)
+    application.jinja_env.globals.update(render_component=render.render_component)
 
     return application
 
 
+def redis_options(application):
+    vcap_services = parse_vcap_services()
+    redis_opts = {
+        'ssl': application.config['REDIS_SSL'],
+        'ssl_ca_certs': application.config['REDIS_SSL_CA_CERTS'],
+        'ssl_cert_reqs': application.config['REDIS_SSL_HOST_REQ'],
+        'max_connections': application.config['REDIS_MAX_CONNECTIONS'],
+        'socket_keepalive': application.config['REDIS_SOCKET_KEEPALIVE'],
+        'socket_timeout': application.config['REDIS_SOCKET_TIMEOUT'],
+        'socket_connect_timeout': application.config['REDIS_SOCKET_CONNECT_TIMEOUT'],
+        'health_check_interval': application.config['REDIS_HEALTH_CHECK_INTERVAL'],
+    }
+    if vcap_services and 'redis' in vcap_services:
+        redis_opts['host'] = vcap_services['redis'][0]['credentials']['hostname']
+        redis_opts['port'] = vcap_services['redis'][0]['credentials']['port']
+        redis_opts['password'] = vcap_services['redis'][0]['credentials']['password']
+    else:
+        redis_opts['host'] = application.config['REDIS_SERVER_HOST']
+        redis_opts['port'] = application.config['REDIS_SERVER_PORT']
+        redis_opts['password'] = application.config['REDIS_SERVER_PASSWORD']
+    return redis_opts
+
+
 def parse_vcap_services():
     import os
     import json
@@ -0,0 +1,172 @@
+import copy
+from functools import partial
+
+from dmapiclient import APIError
+from flask import current_app, g, has_request_context
+
+from app.resilience import Bulkhead, BulkheadFullError, CircuitBreaker, CircuitOpenError
+
+
+READ_METHOD_PREFIXES = ('get_', 'find_', 'list_')
+# the methods of the ``req`` request builder that send a request, rather than add to its path
+REQUEST_BUILDER_VERBS = ('get', 'post', 'put', 'patch', 'delete')
+
+
+class RequestBuilderProxy(object):
+    """Wraps dmapiclient's ``req`` request builder so each request it sends goes through ``send(verb, method)``.
+
+    Building the path (``req.suppliers(1234).application()``) is passed straight through; only the final verb
+    call (``.get()``, ``.post(...)`` and so on) is handed to `send`, with the builder's method bound to it.
+    """
+
+    def __init__(self, builder, send):
+        self._builder = builder
+        self._send = send
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if name in REQUEST_BUILDER_VERBS:
+            return partial(self._send, name, attr)
+        return RequestBuilderProxy(attr, self._send)
+
+    def __call__(self, *args, **kwargs):
+        return RequestBuilderProxy(self._builder(*args, **kwargs), self._send)
+
+
+class RequestCachedAPIClient(object):
+    """Wraps a :class:`dmapiclient.DataAPIClient`, deduplicating identical reads made within one request.
+
+    ``get_*``, ``find_*`` and ``list_*`` calls are memoized on :data:`flask.g`, keyed on the method name and its
+    arguments. Any other public method call, and any request other than a GET sent with the ``req`` builder, is
+    treated as a write and clears the cache for the current request. The client's private helpers (such as ``_get``)
+    are passed straight through, as are all calls outside of a request (e.g. in manager commands).
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        if name == 'req':
+            return RequestBuilderProxy(self._client.req, self._send_built_request)
+
+        attr = getattr(self._client, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+        if name.startswith(READ_METHOD_PREFIXES):
+            return self._cached_read(name, attr)
+        return self._write(attr)
+
+    @staticmethod
+    def _cache_enabled():
+        return has_request_context() and current_app.config.get('DM_API_REQUEST_CACHE', False)
+
+    def clear_request_cache(self):
+        if has_request_context():
+            g.pop('_api_request_cache', None)
+
+    def _cached_read(self, name, method):
+        def read(*args, **kwargs):
+            if not self._cache_enabled():
+                return method(*args, **kwargs)
+
+            key = (name, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                return method(*args, **kwargs)
+
+            request_cache = g.setdefault('_api_request_cache', {})
+            if key not in request_cache:
+                # store a private copy, callers are free to mutate what they get back
+                request_cache[key] = copy.deepcopy(method(*args, **kwargs))
+            return copy.deepcopy(request_cache[key])
+
+        return read
+
+    def _send_built_request(self, verb, method, *args, **kwargs):
+        if verb == 'get':
+            return method(*args, **kwargs)
+        return self._write(method)(*args, **kwargs)
+
+    def _write(self, method):
+        def write(*args, **kwargs):
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.clear_request_cache()
+
+        return write
+
+
+class DataAPIUnavailable(APIError):
+    """Raised instead of calling the Data API while it is known to be failing or overloaded.
+
+    It is an APIError with a 503 status, so views fail fast into the usual error page.
+    """
+
+    def __init__(self, message):
+        super(DataAPIUnavailable, self).__init__(message=message)
+
+    @property
+    def status_code(self):
+        return 503
+
+
+class GuardedAPIClient(object):
+    """Wraps a :class:`dmapiclient.DataAPIClient` in a bulkhead and a circuit breaker.
+
+    The bulkhead caps the calls each process has in flight to the API at DM_API_MAX_CONCURRENT_CALLS, so when the
+    API slows down the remaining worker threads are left to serve pages that don't need it. After
+    DM_API_BREAKER_THRESHOLD consecutive server errors or connection failures the breaker stops calling the API for
+    DM_API_BREAKER_RESET_TIMEOUT seconds. In both cases the call raises :class:`DataAPIUnavailable` straight away.
+    Requests sent with the ``req`` request builder are guarded the same way.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self.bulkhead = None
+        self.breaker = None
+
+    def init_app(self, app):
+        self.bulkhead = Bulkhead(app.config['DM_API_MAX_CONCURRENT_CALLS'], app.config['DM_API_BULKHEAD_TIMEOUT'])
+        self.breaker = CircuitBreaker(
+            app.config['DM_API_BREAKER_THRESHOLD'],
+            app.config['DM_API_BREAKER_RESET_TIMEOUT'],
+            is_failure=_is_api_failure,
+        )
+        self._client.init_app(app)
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if self.breaker is None:
+            return attr
+        if name == 'req':
+            return RequestBuilderProxy(attr, self._send_built_request)
+        if not callable(attr):
+            return attr
+        return self._guard(attr)
+
+    def _send_built_request(self, verb, method, *args, **kwargs):
+        return self._guard(method)(*args, **kwargs)
+
+    def _guard(self, method):
+        def guarded(*args, **kwargs):
+            try:
+                return self.bulkhead.call(self.breaker.call, method, *args, **kwargs)
+            except CircuitOpenError:
+                raise DataAPIUnavailable('Not calling the Data API while it is failing')
+            except BulkheadFullError:
+                raise DataAPIUnavailable('Too many Data API calls in flight')
+
+        return guarded
+
+    def stats(self):
+        return {
+            'breaker': self.breaker and self.breaker.stats(),
+            'bulkhead': self.bulkhead and self.bulkhead.stats(),
+        }
+
+
+def _is_api_failure(e):
+    # 4xx responses are the API working normally
+    return isinstance(e, APIError) and e.status_code >= 500
@@ -0,0 +1,159 @@
+import json
+import logging
+import os
+import socket
+import time
+from collections import OrderedDict
+
+import backoff
+import redis
+import rollbar
+import six
+from flask import current_app, render_template
+from flask_script import Manager
+
+from dmutils import email
+from dmutils.email import EmailError
+
+
+# Emails are sent straight from the request unless DM_EMAIL_OUTBOX is set, in which case the request only pushes the
+# rendered email onto a Redis list and returns. A worker then does the actual sending:
+# $ python application.py email_outbox drain
+#
+# Each worker keeps the message it is sending on a processing list of its own until it is delivered, and refreshes a
+# heartbeat key while it runs. When a worker starts, it puts back on the outbox whatever is on the processing lists of
+# workers whose heartbeat has expired (ie that died part way through), so nothing is lost and nothing another worker
+# is still sending is sent twice. Messages that still fail after DM_EMAIL_OUTBOX_MAX_TRIES attempts are moved to a
+# 'dead' list for inspection.
+
+
+def send_email(to_email_addresses, email_body, subject, from_email, from_name, *args, **kwargs):
+    """Send an email, or queue it for the outbox worker if the outbox is enabled.
+
+    Takes the same arguments as :func:`dmutils.email.send_email`. Raises EmailError if the email could not be sent
+    or, with the outbox enabled, could not be queued.
+    """
+    if not current_app.config['DM_EMAIL_OUTBOX']:
+        return email.send_email(to_email_addresses, email_body, subject, from_email, from_name, *args, **kwargs)
+
+    message = json.dumps({
+        'args': [to_email_addresses, email_body, subject, from_email, from_name] + list(args),
+        'kwargs': kwargs,
+        'queued_at': time.time(),
+    })
+    try:
+        _redis().lpush(_outbox_key(), message)
+    except redis.RedisError as e:
+        raise EmailError(six.text_type(e))
+
+
+def send_bulk_email(recipients, template_name, subject, from_email, from_name, *args, **kwargs):
+    """Send a templated email to many recipients with as few provider calls as possible.
+
+    The template is rendered once per distinct context, and each rendered email goes to up to DM_EMAIL_BATCH_SIZE
+    recipients per call. Recipients in a batch share the To line, so only use this for people who may see each
+    other's addresses, eg the users of one supplier.
+
+    :param recipients: iterable of ``(email_address, context)`` pairs, where context is a dict of template variables
+    :return: a dict of the addresses that could not be sent to, mapped to the error message
+    """
+    groups = OrderedDict()
+    for email_address, context in recipients:
+        key = json.dumps(context, sort_keys=True, default=six.text_type)
+        groups.setdefault(key, (context, []))[1].append(email_address)
+
+    batch_size = current_app.config['DM_EMAIL_BATCH_SIZE']
+    failures = {}
+    for context, email_addresses in groups.values():
+        email_body = render_template(template_name, **context)
+        for start in range(0, len(email_addresses), batch_size):
+            batch = email_addresses[start:start + batch_size]
+            try:
+                send_email(batch, email_body, subject, from_email, from_name, *args, **kwargs)
+            except EmailError as e:
+                failures.update((email_address, six.text_type(e)) for email_address in batch)
+
+    return failures
+
+
+def drain(once=False):
+    """
+    Send the emails waiting in the outbox, retrying failures with exponential backoff.
+
+    Runs until interrupted, or until the outbox is empty if --once is given.
+    """
+    client = _redis()
+    worker = '{}:{}'.format(socket.gethostname(), os.getpid())
+    outbox, processing, dead = _outbox_key(), _outbox_key('processing', worker), _outbox_key('dead')
+
+    _heartbeat(client, worker)
+    client.sadd(_outbox_key('workers'), worker)
+    recover_abandoned(client)
+
+    try:
+        while True:
+            if once:
+                message = client.rpoplpush(outbox, processing)
+                if message is None:
+                    return
+            else:
+                message = client.brpoplpush(outbox, processing, timeout=5)
+                if message is None:
+                    _heartbeat(client, worker)
+                    continue
+
+            _heartbeat(client, worker)
+            try:
+                _deliver(message)
+            except Exception:
+                rollbar.report_exc_info()
+                logging.exception('Giving up on outbox email, moving it to {}'.format(dead))
+                client.lpush(dead, message)
+            client.lrem(processing, 1, message)
+    finally:
+        # anything left on the processing list is recovered by the next worker once the heartbeat has gone
+        client.delete(_outbox_key('heartbeat', worker))
+
+
+def recover_abandoned(client):
+    """Put the emails on the processing lists of workers that have stopped back on the outbox."""
+    for worker in client.smembers(_outbox_key('workers')):
+        if client.exists(_outbox_key('heartbeat', worker)):
+            continue
+        processing = _outbox_key('processing', worker)
+        while client.rpoplpush(processing, _outbox_key()) is not None:
+            pass
+        client.srem(_outbox_key('workers'), worker)
+
+
+def _heartbeat(client, worker):
+    client.set(_outbox_key('heartbeat', worker), '1', ex=current_app.config['DM_EMAIL_OUTBOX_WORKER_TIMEOUT'])
+
+
+def _deliver(message):
+    message = json.loads(message)
+
+    @backoff.on_exception(backoff.expo, EmailError, max_tries=current_app.config['DM_EMAIL_OUTBOX_MAX_TRIES'])
+    def send():
+        email.send_email(*message['args'], **message['kwargs'])
+
+    send()
+
+
+def _redis():
+    return current_app.extensions['redis']
+
+
+def _outbox_key(*suffixes):
+    return ':'.join((current_app.config['DM_EMAIL_OUTBOX_KEY'],) + suffixes)
+
+
+def init_manager(manager):
+    """Adds the email outbox worker commands to the Flask Script manager."""
+    sub_manager = Manager(
+        description='Commands for the outbound email queue',
+        usage='Run "python application.py email_outbox -?" to see subcommand list'
+    )
+
+    sub_manager.command(drain)
+    manager.add_command('email_outbox', sub_manager)
@@ -1,9 +1,17 @@
 import csv
 import json
 import logging
+import os
 import requests
 import sys
+import threading
+import time
 import rollbar
+from concurrent.futures import ThreadPoolExecutor
+from gzip import GzipFile
+
+from dateutil.parser import parse as date_parse
+from dateutil.tz import tzutc
 
 from flask import current_app, render_template, url_for
 from flask_script import Manager
@@ -27,9 +35,16 @@ from app.main.helpers.users import generate_supplier_invitation_token
 # After that, this will produce a list of suppliers who haven't received invites:
 # $ python application.py supplier_invites list_candidates > /tmp/invites
 #
+# The list is written out a page at a time as it is fetched from the API. Add --since 2017-06-01 to only list
+# suppliers created after a date, or --gzip to compress the output.
+#
 # And this will send the invites:
 # $ python application.py supplier_invites send < /tmp/invites
 #
+# Large mailouts can be sent several at a time, at a limited rate, and with a checkpoint file so that running the same
+# command again after a failure skips the invites that were already sent:
+# $ python application.py supplier_invites send --workers 8 --rate 10 --checkpoint /tmp/invites.done < /tmp/invites
+#
 # The invite list ultimately comes from data entered into a spreadsheet, so it's a good idea to check the list for
 # obvious errors.  Before doing a live mailout, you can also test sending using the Example Pty Ltd supplier.
 #
@@ -85,7 +100,7 @@ def format_potential_invites(contact_list, sink=sys.stdout):
         output.writerow((name, email_address, supplier_code, supplier_name))
 
 
-def send(source=sys.stdin):
+def send(source=sys.stdin, workers=1, rate=0, checkpoint=None):
     """
     Read CSV list of suppliers to be invited and send invites.
 
@@ -93,37 +108,200 @@ def send(source=sys.stdin):
     E.g.:
     Me,me@example.com,123,Example Supplier
     Someone Else,someone.else@example.com,456,Another Example Supplier
+
+    --workers sets how many invites are sent at a time, --rate caps the invites sent per second (0 for no limit) and
+    --checkpoint names a file listing the rows already invited, which are skipped and added to as invites are sent.
     """
-    for supplier_record in csv.reader(source):
+    workers, rate = int(workers), float(rate)
+    invited = InviteCheckpoint(checkpoint)
+    rate_limiter = RateLimiter(rate)
+
+    def invite(supplier_record):
         name, email_address, supplier_code, supplier_name = supplier_record
+        rate_limiter.wait()
         try:
             send_supplier_invite(name, email_address, int(supplier_code), supplier_name)
         except EmailError as e:
             rollbar.report_exc_info()
             logging.error('Failed to send invitation email to {}'.format(supplier_record))
+            return
         except HTTPError as e:
+            # the email has gone out, so it's still checkpointed so that a rerun doesn't send it again
             rollbar.report_exc_info()
             logging.error('Failed to record invite for {}'.format(supplier_record))
+        invited.add(supplier_record)
+
+    # a generator, so only the rows being worked on are held in memory
+    supplier_records = (record for record in csv.reader(source) if record not in invited)
+    try:
+        if workers <= 1:
+            for supplier_record in supplier_records:
+                invite(supplier_record)
+        else:
+            _invite_concurrently(invite, supplier_records, workers)
+    finally:
+        invited.close()
+
+
+def _invite_concurrently(invite, supplier_records, workers):
+    """Invites several suppliers at a time, failing the same way as inviting them in turn.
+
+    An exception that `invite` doesn't handle stops any more rows being started and, once the rows already started
+    have finished, is re-raised here.
+    """
+    app = current_app._get_current_object()
+    # don't read further ahead of the workers than needed to keep them busy
+    slots = threading.BoundedSemaphore(workers * 2)
+    failed = []
+
+    def run(supplier_record):
+        try:
+            with app.test_request_context():
+                invite(supplier_record)
+        finally:
+            slots.release()
+
+    def check(future):
+        if future.exception() is not None:
+            failed.append(future)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for supplier_record in supplier_records:
+            slots.acquire()
+            if failed:
+                break
+            executor.submit(run, supplier_record).add_done_callback(check)
+
+    if failed:
+        failed[0].result()
+
+
+class InviteCheckpoint(object):
+    """The CSV rows already invited, loaded from and appended to the file at `path` (if there is one)."""
+
+    def __init__(self, path=None):
+        self._invited = set()
+        self._file = None
+        self._lock = threading.Lock()
+        if path:
+            if os.path.exists(path):
+                with open(path) as f:
+                    self._invited.update(tuple(row) for row in csv.reader(f))
+            self._file = open(path, 'a')
+            self._writer = csv.writer(self._file)
+
+    def __contains__(self, supplier_record):
+        return tuple(supplier_record) in self._invited
+
+    def add(self, supplier_record):
+        if self._file is None:
+            return
+        with self._lock:
+            self._writer.writerow(supplier_record)
+            self._file.flush()
 
+    def close(self):
+        if self._file is not None:
+            self._file.close()
 
-def list_candidates(sink=sys.stdout):
+
+class RateLimiter(object):
+    """Spaces out calls to :meth:`wait`, across threads, so there are at most `rate` per second."""
+
+    def __init__(self, rate):
+        self._interval = 1.0 / rate if rate > 0 else 0
+        self._next_slot = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.time()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        time.sleep(slot - now)
+
+
+def list_candidates(sink=sys.stdout, since=None, gzip=False):
     """
     Output list of candidates for supplier account invites as CSV list.
 
-    The format is the same as for send_supplier_invites.
+    The format is the same as for send_supplier_invites. --since only lists candidates created after the given date
+    and --gzip compresses the output.
     """
     response = data_api_client.list_supplier_account_invite_candidates()
-    format_potential_invites(response['results'], sink)
+    export_potential_invites(response, sink, since, gzip)
 
 
-def list_unclaimed(sink=sys.stdout):
+def list_unclaimed(sink=sys.stdout, since=None, gzip=False):
     """
     Output list of unclaimed invitees in CSV format for resending invites.
 
-    The format is the same as for send_supplier_invites.
+    The format is the same as for send_supplier_invites. --since only lists invitees created after the given date
+    and --gzip compresses the output.
     """
     response = data_api_client.list_unclaimed_supplier_account_invites()
-    format_potential_invites(response['results'], sink)
+    export_potential_invites(response, sink, since, gzip)
+
+
+def export_potential_invites(response, sink, since=None, gzip=False):
+    """Writes the results of a (possibly paged) list response as CSV, one page at a time."""
+    candidates = iter_results(response)
+    if since:
+        candidates = created_since(candidates, _as_utc(since))
+
+    if gzip:
+        sink = GzipFile(fileobj=sink, mode='wb')
+    try:
+        format_potential_invites(candidates, sink)
+    finally:
+        if gzip:
+            sink.close()
+
+
+def iter_results(response):
+    """Yields the results of an API list response, fetching any further pages from its 'links.next' as needed."""
+    while True:
+        for result in response['results']:
+            yield result
+        next_url = response.get('links', {}).get('next')
+        if not next_url:
+            return
+        response = get_page(next_url)
+
+
+def get_page(url):
+    """Fetches a page of results from a link in an API list response, such as its 'links.next'.
+
+    The API client has no public method for following the absolute links the API returns, so this is the one place
+    that relies on its internal ``_get``.
+    """
+    return data_api_client._get(url)
+
+
+def created_since(candidates, since):
+    """Filters out candidates created before `since`.
+
+    Candidates without a creation time can't be shown to be recent, so they're left out too, with a warning saying how
+    many there were.
+    """
+    undated = 0
+    for candidate in candidates:
+        created_at = candidate.get('createdAt')
+        if created_at is None:
+            undated += 1
+        elif _as_utc(created_at) >= since:
+            yield candidate
+    if undated:
+        logging.warning('Left out {} candidates with no creation time'.format(undated))
+
+
+def _as_utc(timestamp):
+    timestamp = date_parse(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(tzutc()).replace(tzinfo=None)
+    return timestamp
 
 
 def init_manager(manager):
@@ -1,42 +1,57 @@
+import os
+
 from flask import Blueprint
-from dmcontent.content_loader import ContentLoader
+
+from .helpers.content import LazyContentLoader, load_content
 
 main = Blueprint('main', __name__)
 
-content_loader = ContentLoader('app/content')
-content_loader.load_manifest('g-cloud-6', 'services', 'edit_service')
-content_loader.load_messages('g-cloud-6', ['dates'])
-
-content_loader.load_manifest('g-cloud-7', 'services', 'edit_service')
-content_loader.load_manifest('g-cloud-7', 'services', 'edit_submission')
-content_loader.load_manifest('g-cloud-7', 'declaration', 'declaration')
-content_loader.load_messages('g-cloud-7', ['dates'])
-
-content_loader.load_manifest('digital-outcomes-and-specialists', 'declaration', 'declaration')
-content_loader.load_manifest('digital-outcomes-and-specialists', 'services', 'edit_submission')
-content_loader.load_manifest('digital-outcomes-and-specialists', 'briefs', 'edit_brief')
-content_loader.load_manifest('digital-outcomes-and-specialists', 'brief-responses', 'edit_brief_response')
-content_loader.load_manifest('digital-outcomes-and-specialists', 'brief-responses', 'display_brief_response')
-content_loader.load_messages('digital-outcomes-and-specialists', ['dates'])
-
-content_loader.load_manifest('digital-service-professionals', 'declaration', 'declaration')
-content_loader.load_manifest('digital-service-professionals', 'services', 'edit_submission')
-content_loader.load_manifest('digital-service-professionals', 'briefs', 'edit_brief')
-content_loader.load_manifest('digital-service-professionals', 'brief-responses', 'edit_brief_response')
-content_loader.load_manifest('digital-service-professionals', 'brief-responses', 'display_brief_response')
-content_loader.load_messages('digital-service-professionals', ['dates'])
-
-content_loader.load_manifest('digital-marketplace', 'declaration', 'declaration')
-content_loader.load_manifest('digital-marketplace', 'services', 'edit_submission')
-content_loader.load_manifest('digital-marketplace', 'briefs', 'edit_brief')
-content_loader.load_manifest('digital-marketplace', 'brief-responses', 'edit_brief_response')
-content_loader.load_manifest('digital-marketplace', 'brief-responses', 'display_brief_response')
-content_loader.load_messages('digital-marketplace', ['dates'])
-
-content_loader.load_manifest('g-cloud-8', 'services', 'edit_service')
-content_loader.load_manifest('g-cloud-8', 'services', 'edit_submission')
-content_loader.load_manifest('g-cloud-8', 'declaration', 'declaration')
-content_loader.load_messages('g-cloud-8', ['dates'])
+CONTENT_PATH = 'app/content'
+
+CONTENT_MANIFESTS = [
+    ('g-cloud-6', 'services', 'edit_service'),
+
+    ('g-cloud-7', 'services', 'edit_service'),
+    ('g-cloud-7', 'services', 'edit_submission'),
+    ('g-cloud-7', 'declaration', 'declaration'),
+
+    ('digital-outcomes-and-specialists', 'declaration', 'declaration'),
+    ('digital-outcomes-and-specialists', 'services', 'edit_submission'),
+    ('digital-outcomes-and-specialists', 'briefs', 'edit_brief'),
+    ('digital-outcomes-and-specialists', 'brief-responses', 'edit_brief_response'),
+    ('digital-outcomes-and-specialists', 'brief-responses', 'display_brief_response'),
+
+    ('digital-service-professionals', 'declaration', 'declaration'),
+    ('digital-service-professionals', 'services', 'edit_submission'),
+    ('digital-service-professionals', 'briefs', 'edit_brief'),
+    ('digital-service-professionals', 'brief-responses', 'edit_brief_response'),
+    ('digital-service-professionals', 'brief-responses', 'display_brief_response'),
+
+    ('digital-marketplace', 'declaration', 'declaration'),
+    ('digital-marketplace', 'services', 'edit_submission'),
+    ('digital-marketplace', 'briefs', 'edit_brief'),
+    ('digital-marketplace', 'brief-responses', 'edit_brief_response'),
+    ('digital-marketplace', 'brief-responses', 'display_brief_response'),
+
+    ('g-cloud-8', 'services', 'edit_service'),
+    ('g-cloud-8', 'services', 'edit_submission'),
+    ('g-cloud-8', 'declaration', 'declaration'),
+]
+
+CONTENT_MESSAGES = [
+    ('g-cloud-6', ['dates']),
+    ('g-cloud-7', ['dates']),
+    ('digital-outcomes-and-specialists', ['dates']),
+    ('digital-service-professionals', ['dates']),
+    ('digital-marketplace', ['dates']),
+    ('g-cloud-8', ['dates']),
+]
+
+# manifests are parsed on first use (see DM_CONTENT_WARMUP_FRAMEWORKS), or all at once from DM_CONTENT_SNAPSHOT,
+# a file built with `python application.py build_content_snapshot`
+content_loader = load_content(
+    LazyContentLoader(CONTENT_PATH), CONTENT_PATH, CONTENT_MANIFESTS, CONTENT_MESSAGES, os.getenv('DM_CONTENT_SNAPSHOT')
+)
 
 from .views import services, suppliers, login, frameworks, users, briefs, signup  # noqa
 from . import errors  # noqa
@@ -2,12 +2,23 @@
 
 import six
 import datetime
+from collections import namedtuple
+from functools import partial
 
 from flask import abort, current_app, render_template
 from flask_login import current_user
 
 from dmapiclient.audit import AuditTypes
-from dmutils.email import send_email, EmailError
+from dmutils.email import EmailError
+
+from app import cache
+from app.emails import send_email
+from .concurrency import fetch_concurrently
+from .frameworks import get_framework_id, get_supplier_framework_ids
+
+BRIEF_AUDIENCE_CACHE_KEY = 'brief-audience:{}:{}'
+BRIEF_ELIGIBILITY_CACHE_KEY = 'brief-eligibility:{}:{}:{}:{}'
+PENDING_ASSESSMENT_TEMPLATE = 'briefs/pending_initial_seller_assessment.html'
 
 
 def get_brief(data_api_client, brief_id, allowed_statuses=None):
@@ -22,17 +33,100 @@ def get_brief(data_api_client, brief_id, allowed_statuses=None):
     return brief
 
 
-def is_supplier_selected_for_brief(data_api_client, current_user, brief):
-    def domain(email):
-        return email.split('@')[-1]
+class BriefContext(namedtuple('BriefContext', ['brief', 'supplier', 'brief_responses'])):
+    """What the opportunity pages need about a brief and the supplier responding to it.
+
+    `brief_responses` are the supplier's responses to the brief. What's needed only to decide whether the supplier is
+    eligible is left to :func:`is_supplier_not_eligible_for_brief`, which usually has the decision cached.
+    """
+
+    __slots__ = ()
+
+    @property
+    def has_responded(self):
+        return len(self.brief_responses) != 0
+
+
+def get_brief_context(data_api_client, brief_id, supplier_code, allowed_statuses=None):
+    """Fetch the brief and what's needed about the supplier for it together, as a :class:`BriefContext`.
+
+    None of the fetches depend on each other, so they're made at the same time: a page waits for the slowest of
+    them rather than all of them in turn.
+    """
+    return BriefContext(**fetch_concurrently(
+        ('brief', partial(get_brief, data_api_client, brief_id, allowed_statuses)),
+        ('supplier', partial(get_supplier, data_api_client, supplier_code)),
+        ('brief_responses', partial(get_brief_responses, data_api_client, brief_id, supplier_code)),
+    ))
+
+
+def get_supplier(data_api_client, supplier_code):
+    return data_api_client.get_supplier(supplier_code)['supplier']
+
+
+def get_seller_application(data_api_client, application_id):
+    if not application_id:
+        return None
+    try:
+        return data_api_client.get_application(application_id).get('application')
+    except:  # noqa
+        return None
+
+
+def get_brief_responses(data_api_client, brief_id, supplier_code):
+    return data_api_client.find_brief_responses(brief_id=brief_id, supplier_code=supplier_code)['briefResponses']
+
+
+class BriefAudience(namedtuple('BriefAudience', ['email_addresses', 'email_domains', 'seller_codes'])):
+    """Who a brief was opened to: lowercase email addresses and their domains, and seller codes as strings."""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_brief(cls, brief):
+        if brief.get('sellerSelector', '') == 'oneSeller':
+            email_addresses = [brief.get('sellerEmail', '')]
+        else:
+            email_addresses = brief.get('sellerEmailList', [])
+        email_addresses = frozenset(email_address.lower() for email_address in email_addresses if email_address)
+        return cls(
+            email_addresses=email_addresses,
+            email_domains=frozenset(email_domain(email_address) for email_address in email_addresses),
+            seller_codes=frozenset(str(code) for code in brief.get('sellers', {}).keys()),
+        )
+
+    def includes_email(self, email_address):
+        """Whether the address, or any address at its domain unless it's a generic one like gmail.com, is invited."""
+        email_address = email_address.lower()
+        if email_address in self.email_addresses:
+            return True
+        domain = email_domain(email_address)
+        return domain not in current_app.config['GENERIC_EMAIL_DOMAINS'] and domain in self.email_domains
+
+    def includes_seller(self, supplier_code):
+        return str(supplier_code) in self.seller_codes
+
+
+def email_domain(email_address):
+    return email_address.split('@')[-1]
+
 
-    current_user_domain = domain(current_user.email_address) \
-        if domain(current_user.email_address) not in current_app.config.get('GENERIC_EMAIL_DOMAINS') \
-        else None
+def get_brief_audience(brief):
+    """Return the :class:`BriefAudience` of a brief, cached for each version of the brief."""
+    key = BRIEF_AUDIENCE_CACHE_KEY.format(brief.get('id'), brief.get('updatedAt'))
+    audience = cache.get(key)
+    if audience is None:
+        audience = BriefAudience.from_brief(brief)
+        cache.set(key, audience, timeout=current_app.config['DM_BRIEF_AUDIENCE_CACHE_TIMEOUT'])
+    return audience
+
+
+def is_supplier_selected_for_brief(data_api_client, current_user, brief, supplier=None):
+    is_supplier = hasattr(current_user, 'role') and current_user.role == 'supplier'
     if brief.get('lot', '') == 'atm':
-        if hasattr(current_user, 'role') and current_user.role == 'supplier':
-            brief_category = brief.get('sellerCategory', '')
-            supplier = data_api_client.get_supplier(current_user.supplier_code)['supplier']
+        if is_supplier:
+            if supplier is None:
+                supplier = get_supplier(data_api_client, current_user.supplier_code)
             open_to = brief.get('openTo', '')
             area_of_expertise = brief.get('areaOfExpertise', '')
             if (supplier and
@@ -44,47 +138,53 @@ def is_supplier_selected_for_brief(data_api_client, current_user, brief):
         else:
             return False
     if brief.get('lot', '') == 'rfx':
-        if (hasattr(current_user, 'role') and
-           current_user.role == 'supplier' and
-           str(current_user.supplier_code) in brief.get('sellers', {}).keys()):
-            return True
-        else:
-            return False
+        return is_supplier and get_brief_audience(brief).includes_seller(current_user.supplier_code)
     if brief.get('lot', '') == 'specialist':
-        if (
-            hasattr(current_user, 'role') and
-            current_user.role == 'supplier' and (
-                brief.get('sellerSelector', '') == 'allSellers' or
-                str(current_user.supplier_code) in brief.get('sellers', {}).keys()
-            )
-        ):
-            return True
-        else:
-            return False
+        return is_supplier and (
+            brief.get('sellerSelector', '') == 'allSellers' or
+            get_brief_audience(brief).includes_seller(current_user.supplier_code)
+        )
     if brief.get('sellerSelector', '') == 'allSellers':
         return True
-    if brief.get('sellerSelector', '') == 'someSellers':
-        seller_domain_list = [domain(x).lower() for x in brief.get('sellerEmailList', [])]
-        return (current_user.email_address in
-                (email_address.lower() for email_address in brief.get('sellerEmailList', [])) or
-                (current_user_domain.lower() in seller_domain_list if current_user_domain else False))
-    if brief.get('sellerSelector', '') == 'oneSeller':
-        return (current_user.email_address.lower() == brief.get('sellerEmail', '').lower() or
-                (current_user_domain.lower() == domain(brief.get('sellerEmail', '').lower())
-                if current_user_domain else False))
+    if brief.get('sellerSelector', '') in ('someSellers', 'oneSeller'):
+        return get_brief_audience(brief).includes_email(current_user.email_address)
     return False
 
 
-def is_supplier_not_eligible_for_brief(data_api_client, supplier_code, brief):
-    supplier = data_api_client.get_supplier(supplier_code)['supplier']
-    # if framework is new framework dm, old or new seller is deemed to be approved
-    digital_marketplace_seller = False
+def is_supplier_not_eligible_for_brief(data_api_client, supplier_code, brief, supplier=None):
+    """Return the template explaining why the supplier can't respond to the brief, or None if they can.
+
+    The decision is cached for DM_BRIEF_ELIGIBILITY_CACHE_TIMEOUT seconds per supplier, application and version of
+    the brief, so viewing, submitting and seeing the result of a response only work it out once. The supplier's
+    application and the digital-marketplace framework id are only fetched when it isn't cached; pass the `supplier`
+    if the page already has it. Whenever a supplier whose application is waiting for assessment is turned away, cached
+    or not, the API is asked to prioritise the assessment.
+    """
+    key = BRIEF_ELIGIBILITY_CACHE_KEY.format(
+        supplier_code, current_user.application_id, brief['id'], brief.get('updatedAt'))
+    decision = cache.get(key)
+    if decision is None:
+        calls = [
+            ('application', partial(get_seller_application, data_api_client, current_user.application_id)),
+            ('framework_id', partial(get_framework_id, data_api_client, 'digital-marketplace')),
+        ]
+        if supplier is None:
+            calls.append(('supplier', partial(get_supplier, data_api_client, supplier_code)))
+        fetched = fetch_concurrently(*calls)
+        # cache eligible as '' so that it isn't mistaken for a miss
+        decision = _supplier_not_eligible_for_brief(
+            brief, fetched.get('supplier', supplier), fetched['application'], fetched['framework_id']) or ''
+        cache.set(key, decision, timeout=current_app.config['DM_BRIEF_ELIGIBILITY_CACHE_TIMEOUT'])
+
+    if decision == PENDING_ASSESSMENT_TEMPLATE:
+        # triggers jiraapi fn to prioritise a related approval task
+        data_api_client.req.prioritise(current_user.application_id).post(brief.get('dates').get('closing_date'))
+    return decision or None
 
-    digital_marketplace_framework = data_api_client.get_framework('digital-marketplace')
 
-    for framework in supplier.get('frameworks', []):
-        if framework['framework_id'] == digital_marketplace_framework['frameworks']['id']:
-            digital_marketplace_seller = True
+def _supplier_not_eligible_for_brief(brief, supplier, application, digital_marketplace_framework_id):
+    # if framework is new framework dm, old or new seller is deemed to be approved
+    digital_marketplace_seller = digital_marketplace_framework_id in get_supplier_framework_ids(supplier)
     existing_seller = len(supplier.get('domains', {'legacy': []})['legacy']) > 0
     old_panel = brief.get('frameworkFramework') == 'dsp'
 
@@ -97,35 +197,19 @@ def is_supplier_not_eligible_for_brief(data_api_client, supplier_code, brief):
         if not digital_marketplace_seller and not old_panel:
             return 'briefs/cant_apply_to_new_panel_opportunity.html'
 
-    brief_closing_date = brief.get('dates').get('closing_date')
     application_status = None
-    application_id = current_user.application_id
-    if application_id:
-        try:
-            application = data_api_client.get_application(application_id)
-            application_type = application.get('application').get('type')
-            if application_type == 'new' or application_type == 'upgrade':
-                application_status = application.get('application').get('status')
-        except:  # noqa
-            pass
+    if application and application.get('type') in ('new', 'upgrade'):
+        application_status = application.get('status')
 
     # user expresses interest in brief but they are not an assessed seller
     if application_status == 'submitted':
-        # triggers jiraapi fn to prioritise a related approval task
-        data_api_client.req.prioritise(application_id).post(brief_closing_date)
-        return 'briefs/pending_initial_seller_assessment.html'
+        return PENDING_ASSESSMENT_TEMPLATE
 
     # sanity check
     if supplier is None:
         return 'briefs/not_is_supplier_eligible_for_brief_error.html'
 
 
-def supplier_has_a_brief_response(data_api_client, supplier_code, brief_id):
-    brief_response_result = data_api_client.find_brief_responses(brief_id=brief_id, supplier_code=supplier_code)
-    brief_responses = brief_response_result['briefResponses']
-    return len(brief_responses) != 0
-
-
 def supplier_is_assessed(supplier, domain):
     return 'assessed' in supplier['supplier']['domains'] and \
         domain in supplier['supplier']['domains']['assessed']
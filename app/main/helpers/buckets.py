@@ -0,0 +1,23 @@
+import os
+import threading
+
+from flask import current_app
+from dmutils import s3
+
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(bucket_name):
+    """Return an :class:`dmutils.s3.S3` for `bucket_name`, reused across requests.
+
+    The boto3 clients underneath are thread safe, so every thread in a process shares one per bucket. Buckets aren't
+    shared with processes forked from this one, as a client's connections can't be.
+    """
+    pool = current_app.extensions.setdefault('dm_s3_buckets', {})
+    buckets = pool.get(os.getpid())
+    if buckets is None or bucket_name not in buckets:
+        with _buckets_lock:
+            buckets = pool.setdefault(os.getpid(), {})
+            if bucket_name not in buckets:
+                buckets[bucket_name] = s3.S3(bucket_name)
+    return buckets[bucket_name]
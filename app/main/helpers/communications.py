@@ -0,0 +1,63 @@
+from flask import current_app
+
+from app import cache
+from .buckets import get_bucket
+
+COMMUNICATIONS_INDEX_CACHE_KEY = 'communications-index:{}'
+UPDATES_PREFIX = 'communications/updates/'
+
+
+class CommunicationsIndex(object):
+    """A framework's files in the communications bucket, indexed for the dashboard and updates pages.
+
+    :param framework_slug: the framework the files were listed for
+    :param files: file dicts as returned by :meth:`dmutils.s3.S3.list` with ``load_timestamps=True``
+    """
+
+    def __init__(self, framework_slug, files):
+        self.framework_slug = framework_slug
+        self.files = [file for file in files if file['path'].startswith('{}/'.format(framework_slug))]
+
+        # 'last_modified' of the last listed file under every directory prefix and for every full path,
+        # relative to the framework folder (eg 'communications/updates/')
+        self._last_modified = {}
+        for file in reversed(self.files):
+            parts = self._relative_path(file).split('/')
+            for depth in range(1, len(parts)):
+                self._last_modified.setdefault('/'.join(parts[:depth]) + '/', file.get('last_modified'))
+            self._last_modified.setdefault('/'.join(parts), file.get('last_modified'))
+
+        # files under communications/updates/, grouped by the folder below it, with paths relative to
+        # communications/ (which is what the download route expects)
+        self.updates = {}
+        for file in self.files:
+            relative_path = self._relative_path(file)
+            if not relative_path.startswith(UPDATES_PREFIX):
+                continue
+            category = relative_path[len(UPDATES_PREFIX):].split('/')[0]
+            self.updates.setdefault(category, []).append(dict(file, path=relative_path[len('communications/'):]))
+
+    def _relative_path(self, file):
+        return file['path'][len(self.framework_slug) + 1:]
+
+    def last_modified(self, prefix):
+        """Return the 'last_modified' timestamp of the last listed file whose relative path starts with `prefix`.
+
+        Directory prefixes and full paths are looked up directly; anything else falls back to a scan.
+        """
+        if prefix in self._last_modified or prefix.endswith('/'):
+            return self._last_modified.get(prefix)
+        return next(
+            (file for file in reversed(self.files) if self._relative_path(file).startswith(prefix)), {}
+        ).get('last_modified')
+
+
+def get_communications_index(framework_slug):
+    """Return the (briefly cached) :class:`CommunicationsIndex` for a framework."""
+    key = COMMUNICATIONS_INDEX_CACHE_KEY.format(framework_slug)
+    index = cache.get(key)
+    if index is None:
+        files = get_bucket(current_app.config['DM_COMMUNICATIONS_BUCKET']).list(framework_slug, load_timestamps=True)
+        index = CommunicationsIndex(framework_slug, list(files))
+        cache.set(key, index, timeout=current_app.config['DM_COMMUNICATIONS_CACHE_TIMEOUT'])
+    return index
@@ -0,0 +1,72 @@
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from flask import _app_ctx_stack, _request_ctx_stack, current_app
+
+_executor_lock = threading.Lock()
+_worker = threading.local()
+
+
+def fetch_concurrently(*calls):
+    """Run independent I/O calls in parallel and return their results keyed by name.
+
+    Each argument is a ``(name, call)`` pair, where the call takes no arguments (usually a
+    :func:`functools.partial`):
+
+        results = fetch_concurrently(
+            ('framework', partial(get_framework, data_api_client, framework_slug)),
+            ('drafts', partial(get_drafts, data_api_client, framework_slug)),
+        )
+
+    The calls run on the app's shared pool of DM_CONCURRENT_FETCH_MAX_WORKERS threads, sharing the caller's app
+    and request context, so helpers relying on ``current_app``, ``request``, ``g`` or ``current_user`` work
+    unchanged. This is safe because the caller blocks until every call has finished. If any calls raise (including
+    ``abort``), the exception from the first of them in the order given is re-raised here, so put the call whose
+    failure matters most (eg the one that 404s) first.
+    """
+    executor = _get_executor()
+    if executor is None or len(calls) <= 1 or getattr(_worker, 'active', False):
+        # a call that fetches concurrently itself runs its calls in turn, rather than wait on the pool it's using
+        return {name: call() for name, call in calls}
+
+    futures = [(name, executor.submit(_in_current_context(call))) for name, call in calls]
+    wait([future for _, future in futures])
+
+    return {name: future.result() for name, future in futures}
+
+
+def _get_executor():
+    max_workers = current_app.config['DM_CONCURRENT_FETCH_MAX_WORKERS']
+    if max_workers <= 1:
+        return None
+
+    executor = current_app.extensions.get('concurrent_fetch_executor')
+    if executor is None:
+        with _executor_lock:
+            executor = current_app.extensions.get('concurrent_fetch_executor')
+            if executor is None:
+                executor = current_app.extensions['concurrent_fetch_executor'] = ThreadPoolExecutor(max_workers)
+    return executor
+
+
+def _in_current_context(call):
+    app_ctx = _app_ctx_stack.top
+    request_ctx = _request_ctx_stack.top
+
+    def run():
+        # push the caller's contexts directly rather than copies: popping a copied request
+        # context would run teardown handlers and close the caller's request
+        _app_ctx_stack.push(app_ctx)
+        if request_ctx is not None:
+            _request_ctx_stack.push(request_ctx)
+        _worker.active = True
+        try:
+            return call()
+        finally:
+            _worker.active = False
+            if request_ctx is not None:
+                _request_ctx_stack.pop()
+            _app_ctx_stack.pop()
+
+    return run
@@ -0,0 +1,225 @@
+"""Loading of the framework content manifests: lazily, and optionally from a prebuilt snapshot.
+
+Parsing the YAML under ``app/content`` takes seconds on every boot. :func:`build_snapshot` pickles the state of a
+fully loaded :class:`dmcontent.content_loader.ContentLoader` together with a hash of the content it was built from,
+so :func:`load_content` can restore it almost instantly and only falls back to the YAML when the content has changed.
+The snapshot also records the size and modification time of each content file, so while those are unchanged booting
+doesn't need to read (and hash) the content at all.
+"""
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from dmcontent.content_loader import ContentLoader
+from six.moves import cPickle as pickle
+
+# bump when the snapshot layout changes (or dmcontent is upgraded) to invalidate existing snapshots
+SNAPSHOT_VERSION = 3
+
+FILTER_CACHE_SIZE = 256
+
+logger = logging.getLogger(__name__)
+
+
+class LazyContentLoader(ContentLoader):
+    """A :class:`ContentLoader` that only parses a manifest or messages file the first time it is used.
+
+    ``load_manifest`` and ``load_messages`` just register what exists; ``get_manifest``, ``get_builder`` and
+    ``get_message`` load it on first access. Loading is guarded by a lock, so concurrent first requests parse each
+    file once. Use :meth:`warm` to load frequently used frameworks up front.
+
+    :meth:`get_filtered_manifest` memoizes ``get_manifest(...).filter(context)``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(LazyContentLoader, self).__init__(*args, **kwargs)
+        self._lock = threading.RLock()
+        self._pending_manifests = {}
+        self._pending_messages = {}
+        self._reset_filter_cache()
+
+    def load_manifest(self, framework_slug, question_set, manifest):
+        self._pending_manifests[(framework_slug, manifest)] = question_set
+
+    def load_messages(self, framework_slug, blocks):
+        self._pending_messages.setdefault(framework_slug, []).extend(blocks)
+
+    def get_manifest(self, framework_slug, manifest):
+        self._load_manifest(framework_slug, manifest)
+        return super(LazyContentLoader, self).get_manifest(framework_slug, manifest)
+
+    def get_builder(self, framework_slug, manifest):
+        return self.get_manifest(framework_slug, manifest)
+
+    def get_message(self, framework_slug, block, *args, **kwargs):
+        self._load_messages(framework_slug)
+        return super(LazyContentLoader, self).get_message(framework_slug, block, *args, **kwargs)
+
+    def get_filtered_manifest(self, framework_slug, manifest, context):
+        """Return ``get_manifest(framework_slug, manifest).filter(context)``, shared between identical contexts.
+
+        Filtering only looks at the context fields that questions in the manifest ``depends`` on (eg ``lot``), so
+        results are cached on the values of those fields, in an LRU cache of ``FILTER_CACHE_SIZE`` entries.
+        The returned manifest is shared: callers must not modify it or its sections.
+        """
+        content = self.get_manifest(framework_slug, manifest)
+        fields = self._filter_fields.get((framework_slug, manifest))
+        if fields is None:
+            fields = self._filter_fields[(framework_slug, manifest)] = _depends_on_fields(content)
+
+        key = (framework_slug, manifest, tuple(context.get(field) for field in fields))
+        try:
+            hash(key)
+        except TypeError:
+            return content.filter(context)
+
+        with self._lock:
+            if key in self._filter_cache:
+                filtered = self._filter_cache.pop(key)
+                self._filter_cache[key] = filtered
+                return filtered
+
+        filtered = content.filter(context)
+        with self._lock:
+            self._filter_cache[key] = filtered
+            while len(self._filter_cache) > FILTER_CACHE_SIZE:
+                self._filter_cache.popitem(last=False)
+        return filtered
+
+    def warm(self, framework_slugs=None):
+        """Load everything registered for `framework_slugs` (or for every framework) now."""
+        for framework_slug, manifest in list(self._pending_manifests):
+            if framework_slugs is None or framework_slug in framework_slugs:
+                self._load_manifest(framework_slug, manifest)
+        for framework_slug in list(self._pending_messages):
+            if framework_slugs is None or framework_slug in framework_slugs:
+                self._load_messages(framework_slug)
+
+    def _load_manifest(self, framework_slug, manifest):
+        if (framework_slug, manifest) not in self._pending_manifests:
+            return
+        with self._lock:
+            question_set = self._pending_manifests.get((framework_slug, manifest))
+            if question_set is not None:
+                super(LazyContentLoader, self).load_manifest(framework_slug, question_set, manifest)
+                del self._pending_manifests[(framework_slug, manifest)]
+
+    def _load_messages(self, framework_slug):
+        if framework_slug not in self._pending_messages:
+            return
+        with self._lock:
+            blocks = self._pending_messages.get(framework_slug)
+            if blocks is not None:
+                super(LazyContentLoader, self).load_messages(framework_slug, blocks)
+                del self._pending_messages[framework_slug]
+
+    def _reset_filter_cache(self):
+        self._filter_cache = OrderedDict()
+        self._filter_fields = {}
+
+    def __getstate__(self):
+        # snapshots hold fully loaded content, but none of the runtime caches
+        self.warm()
+        state = vars(self).copy()
+        for attr in ('_lock', '_filter_cache', '_filter_fields'):
+            del state[attr]
+        return state
+
+    def __setstate__(self, state):
+        vars(self).update(state)
+        self._lock = threading.RLock()
+        self._reset_filter_cache()
+
+
+def _depends_on_fields(content):
+    fields = set()
+    questions = [question for section in content.sections for question in section.questions]
+    while questions:
+        question = questions.pop()
+        fields.update(depend['on'] for depend in question.get('depends') or [])
+        questions.extend(question.get('questions') or [])
+    return tuple(sorted(fields))
+
+
+def content_hash(content_path, manifests, messages):
+    """Hash every file under `content_path` along with what is loaded from it."""
+    digest = hashlib.sha1(repr((SNAPSHOT_VERSION, manifests, messages)))
+    for path in _content_files(content_path):
+        digest.update(os.path.relpath(path, content_path))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def content_fingerprint(content_path, manifests, messages):
+    """A cheap stand-in for :func:`content_hash` from the size and modification time of every file, not its contents.
+
+    The same fingerprint means the same content; a different one (eg after a fresh checkout) doesn't mean different
+    content, only that it needs hashing to find out.
+    """
+    digest = hashlib.sha1(repr((SNAPSHOT_VERSION, manifests, messages)))
+    for path in _content_files(content_path):
+        stat = os.stat(path)
+        digest.update(repr((os.path.relpath(path, content_path), stat.st_size, stat.st_mtime)))
+    return digest.hexdigest()
+
+
+def _content_files(content_path):
+    for root, dirs, files in os.walk(content_path):
+        dirs.sort()
+        for filename in sorted(files):
+            yield os.path.join(root, filename)
+
+
+def load_content(content_loader, content_path, manifests, messages, snapshot_path=None):
+    """Load `manifests` and `messages` into `content_loader`, from the snapshot at `snapshot_path` if it is current.
+
+    :param manifests: list of ``(framework_slug, question_set, manifest)`` tuples
+    :param messages: list of ``(framework_slug, blocks)`` tuples
+    """
+    if snapshot_path and _restore_snapshot(content_loader, content_path, manifests, messages, snapshot_path):
+        return content_loader
+
+    for framework_slug, question_set, manifest in manifests:
+        content_loader.load_manifest(framework_slug, question_set, manifest)
+    for framework_slug, blocks in messages:
+        content_loader.load_messages(framework_slug, blocks)
+    return content_loader
+
+
+def build_snapshot(content_loader, content_path, manifests, messages, snapshot_path):
+    load_content(content_loader, content_path, manifests, messages)
+    snapshot = {
+        'hash': content_hash(content_path, manifests, messages),
+        'fingerprint': content_fingerprint(content_path, manifests, messages),
+        'content_loader': content_loader,
+    }
+
+    # write to a temporary file first so a running worker never reads a half written snapshot
+    tmp_path = '{}.tmp'.format(snapshot_path)
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(snapshot, f, pickle.HIGHEST_PROTOCOL)
+    os.rename(tmp_path, snapshot_path)
+
+
+def _restore_snapshot(content_loader, content_path, manifests, messages, snapshot_path):
+    try:
+        with open(snapshot_path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except IOError:
+        logger.info('No content snapshot at {}, loading content from YAML'.format(snapshot_path))
+        return False
+    except Exception:
+        logger.warning('Unreadable content snapshot at {}, loading content from YAML'.format(snapshot_path),
+                       exc_info=True)
+        return False
+
+    if (snapshot.get('fingerprint') != content_fingerprint(content_path, manifests, messages) and
+            snapshot.get('hash') != content_hash(content_path, manifests, messages)):
+        logger.warning('Content snapshot at {} is out of date, loading content from YAML'.format(snapshot_path))
+        return False
+
+    vars(content_loader).update(vars(snapshot['content_loader']))
+    return True
@@ -2,60 +2,128 @@
 from dmutils.documents import get_agreement_document_path, COUNTERSIGNED_AGREEMENT_FILENAME, SIGNED_AGREEMENT_PREFIX
 import re
 
-from flask import abort
+from flask import abort, current_app
 from flask_login import current_user
 from dmapiclient import APIError
-from dmutils import s3
+
+from app import cache
+from .buckets import get_bucket
+
+FRAMEWORK_CACHE_KEY = 'framework:{}'
+FRAMEWORKS_CACHE_KEY = 'frameworks'
+COUNTERSIGNED_AGREEMENT_CACHE_KEY = 'countersigned-agreement:{}:{}'
+FRAMEWORK_IDS_CACHE_KEY = 'framework-ids'
 
 
 def get_framework(client, framework_slug, allowed_statuses=None):
+    """Get a framework, aborting with a 404 if its status isn't one of `allowed_statuses`.
+
+    Frameworks are cached for DM_FRAMEWORK_CACHE_TIMEOUT, along with an index of their lots. A cached framework whose
+    status isn't allowed is fetched again before giving up, so a framework that has just moved on (eg from pending to
+    live) isn't missing until the cache expires. Callers that only allow open frameworks are the pages that accept
+    applications and edits, so they always fetch the framework to see it close straight away.
+    """
+    return _get_cached_framework(client, framework_slug, allowed_statuses)[0]
+
+
+def _get_cached_framework(client, framework_slug, allowed_statuses):
+    # the (framework, lots index) entry for the framework, fetched again if it may be out of date for the caller
     if allowed_statuses is None:
         allowed_statuses = ['open', 'pending', 'standstill', 'live']
 
-    framework = client.get_framework(framework_slug)['frameworks']
+    cached = None
+    if list(allowed_statuses) != ['open']:
+        cached = cache.get(FRAMEWORK_CACHE_KEY.format(framework_slug))
+    if cached is None or (allowed_statuses and cached[0]['status'] not in allowed_statuses):
+        cached = _cache_framework(framework_slug, client.get_framework(framework_slug)['frameworks'])
 
-    if allowed_statuses and framework['status'] not in allowed_statuses:
+    if allowed_statuses and cached[0]['status'] not in allowed_statuses:
         abort(404)
 
-    return framework
+    return cached
+
+
+def _cache_framework(framework_slug, framework):
+    # the lot index is kept in the same entry so that it always matches the framework
+    cached = (framework, index_framework_lots(framework))
+    cache.set(
+        FRAMEWORK_CACHE_KEY.format(framework_slug), cached, timeout=current_app.config['DM_FRAMEWORK_CACHE_TIMEOUT'])
+    return cached
 
 
 def get_framework_and_lot(client, framework_slug, lot_slug, allowed_statuses=None):
-    framework = get_framework(client, framework_slug, allowed_statuses)
-    return framework, get_framework_lot(framework, lot_slug)
+    framework, lots = _get_cached_framework(client, framework_slug, allowed_statuses)
+    return framework, _get_lot(lots, lot_slug)
 
 
 def frameworks_by_slug(client):
-    framework_list = client.find_frameworks().get("frameworks")
-    frameworks = {}
-    for framework in framework_list:
-        frameworks[framework['slug']] = framework
+    frameworks = cache.get(FRAMEWORKS_CACHE_KEY)
+    if frameworks is None:
+        framework_list = client.find_frameworks().get("frameworks")
+        frameworks = {}
+        for framework in framework_list:
+            frameworks[framework['slug']] = framework
+        _drop_changed_frameworks(frameworks)
+        cache.set(FRAMEWORKS_CACHE_KEY, frameworks, timeout=current_app.config['DM_FRAMEWORK_CACHE_TIMEOUT'])
     return frameworks
 
 
+def _drop_changed_frameworks(frameworks):
+    """Invalidate cached frameworks whose status differs from a fresh listing of them."""
+    cached = cache.get_many(*[FRAMEWORK_CACHE_KEY.format(slug) for slug in frameworks])
+    for (slug, framework), entry in zip(frameworks.items(), cached):
+        if entry is not None and entry[0]['status'] != framework['status']:
+            invalidate_framework_cache(slug)
+
+
+def get_framework_id(client, framework_slug):
+    """Look up a framework's id by its slug.
+
+    Ids never change, so they are kept in a slug to id registry for DM_FRAMEWORK_REGISTRY_TIMEOUT; a slug missing
+    from it is fetched from the API and added.
+    """
+    framework_ids = cache.get(FRAMEWORK_IDS_CACHE_KEY) or {}
+    if framework_slug not in framework_ids:
+        framework_ids = dict(framework_ids)
+        framework_ids[framework_slug] = client.get_framework(framework_slug)['frameworks']['id']
+        cache.set(FRAMEWORK_IDS_CACHE_KEY, framework_ids, timeout=current_app.config['DM_FRAMEWORK_REGISTRY_TIMEOUT'])
+    return framework_ids[framework_slug]
+
+
+def get_supplier_framework_ids(supplier):
+    return frozenset(framework['framework_id'] for framework in supplier.get('frameworks', []))
+
+
+def index_framework_lots(framework):
+    return {lot['slug']: lot for lot in framework.get('lots', [])}
+
+
 def get_framework_lot(framework, lot_slug):
+    return _get_lot(index_framework_lots(framework), lot_slug)
+
+
+def _get_lot(lots, lot_slug):
     try:
-        return next(lot for lot in framework['lots'] if lot['slug'] == lot_slug)
-    except StopIteration:
+        return lots[lot_slug]
+    except KeyError:
         abort(404)
 
 
-def register_interest_in_framework(client, framework_slug):
-    client.register_framework_interest(current_user.supplier_code, framework_slug, current_user.email_address)
-
+def invalidate_framework_cache(framework_slug=None):
+    """Drop cached framework documents so that the next lookup goes back to the API.
 
-def get_last_modified_from_first_matching_file(key_list, framework_slug, prefix):
+    Clears the given framework (and the framework listing), or only the listing if no slug is given.
     """
-    Takes a list of file keys and a string.
-    Returns the 'last_modified' timestamp for first file whose path starts with the passed-in string,
-    or None if no matching file is found.
+    keys = [FRAMEWORKS_CACHE_KEY]
+    if framework_slug is not None:
+        keys.append(FRAMEWORK_CACHE_KEY.format(framework_slug))
+    # not delete_many, which gives up at the first key that isn't cached
+    for key in keys:
+        cache.delete(key)
 
-    :param key_list: list of file keys (from an s3 bucket)
-    :param path_starts_with: check for file paths which start with this string
-    :return: the timestamp of the first matching file key or None
-    """
-    path_starts_with = '{}/{}'.format(framework_slug, prefix)
-    return next((key for key in key_list if key.get('path').startswith(path_starts_with)), {}).get('last_modified')
+
+def register_interest_in_framework(client, framework_slug):
+    client.register_framework_interest(current_user.supplier_code, framework_slug, current_user.email_address)
 
 
 def get_first_question_index(content, section):
@@ -267,10 +335,16 @@ def get_status_for_multi_service_lot_and_service_type(
 
 
 def countersigned_framework_agreement_exists_in_bucket(framework_slug, bucket):
-    agreements_bucket = s3.S3(bucket)
-    countersigned_path = get_agreement_document_path(
-        framework_slug, current_user.supplier_code, COUNTERSIGNED_AGREEMENT_FILENAME)
-    return agreements_bucket.path_exists(countersigned_path)
+    key = COUNTERSIGNED_AGREEMENT_CACHE_KEY.format(framework_slug, current_user.supplier_code)
+    exists = cache.get(key)
+    if exists is None:
+        countersigned_path = get_agreement_document_path(
+            framework_slug, current_user.supplier_code, COUNTERSIGNED_AGREEMENT_FILENAME)
+        exists = bool(get_bucket(bucket).path_exists(countersigned_path))
+        timeout = current_app.config['DM_COUNTERSIGNED_AGREEMENT_CACHE_TIMEOUT'] if exists else \
+            current_app.config['DM_COUNTERSIGNED_AGREEMENT_NEGATIVE_CACHE_TIMEOUT']
+        cache.set(key, exists, timeout=timeout)
+    return exists
 
 
 def get_most_recently_uploaded_agreement_file_or_none(bucket, framework_slug):
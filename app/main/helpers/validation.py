@@ -1,10 +1,12 @@
-from functools import reduce
-from operator import add
 import re
 import six
+from collections import namedtuple
 from werkzeug.datastructures import ImmutableOrderedMultiDict
 
 EMAIL_REGEX = r'^[^@^\s]+@[^@^\.^\s]+(\.[^@^\.^\s]+)+$'
+EMAIL_PATTERN = re.compile(EMAIL_REGEX)
+
+CHARACTER_LIMITED_TYPES = frozenset(['text', 'textbox_large'])
 
 
 def get_validator(framework, content, answers):
@@ -18,6 +20,44 @@ def get_validator(framework, content, answers):
         return validator_cls(content, answers)
 
 
+class DeclarationField(object):
+    """What the validators need to know about one declaration question."""
+
+    def __init__(self, question_id, question):
+        self.id = question_id
+        self.type = question.get('type')
+        number = question.get('number')
+        self.label = "Question {}".format(number) if number else question.get('question')
+        self.validation_messages = {}
+        for validation in question.get('validations', []):
+            self.validation_messages.setdefault(validation['name'], validation['message'])
+
+
+class DeclarationFieldTable(object):
+    """The fields of a declaration manifest in question order, built once per manifest."""
+
+    def __init__(self, content):
+        self.fields = [
+            DeclarationField(question_id, content.get_question(question_id))
+            for section in content
+            for question_id in section.get_question_ids()
+        ]
+        self.ids = [field.id for field in self.fields]
+        self.by_id = {field.id: field for field in self.fields}
+        self.character_limited_ids = [field.id for field in self.fields if field.type in CHARACTER_LIMITED_TYPES]
+
+
+def get_field_table(content):
+    """Return the :class:`DeclarationFieldTable` for `content`, building and caching it on first use."""
+    table = getattr(content, '_declaration_field_table', None)
+    if table is None:
+        table = content._declaration_field_table = DeclarationFieldTable(content)
+    return table
+
+
+PageValidation = namedtuple('PageValidation', ['errors', 'complete'])
+
+
 class DeclarationValidator(object):
     email_validation_fields = []
     number_string_fields = []
@@ -28,32 +68,50 @@ class DeclarationValidator(object):
         self.content = content
         self.answers = answers
 
+    @property
+    def field_table(self):
+        return get_field_table(self.content)
+
+    @classmethod
+    def number_string_patterns(cls):
+        """`number_string_fields` as ``(field, compiled pattern)`` pairs, compiled once per validator class."""
+        if '_number_string_patterns' not in vars(cls):
+            cls._number_string_patterns = [
+                (field, re.compile(r'^\d{{{0}}}$'.format(length))) for field, length in cls.number_string_fields or []
+            ]
+        return cls._number_string_patterns
+
     def get_error_messages_for_page(self, section):
+        return self.validate_page(section).errors
+
+    def validate_page(self, section):
+        """Validate all the answers once.
+
+        Returns the errors for the questions on `section` and whether the declaration as a whole is complete, so a
+        page can be saved with the right status without validating the answers again.
+        """
         all_errors = self.get_error_messages()
-        page_ids = section.get_question_ids()
-        page_errors = ImmutableOrderedMultiDict(filter(lambda err: err[0] in page_ids, all_errors))
-        return page_errors
+        page_ids = set(section.get_question_ids())
+        page_errors = ImmutableOrderedMultiDict(err for err in all_errors if err[0] in page_ids)
+        return PageValidation(page_errors, not all_errors)
 
     def get_error_messages(self):
         raw_errors_map = self.errors()
         errors_map = list()
-        for question_id in self.all_fields():
-            if question_id in raw_errors_map:
-                question_number = self.content.get_question(question_id).get('number')
-                validation_message = self.get_error_message(question_id, raw_errors_map[question_id])
-                errors_map.append((question_id, {
-                    'input_name': question_id,
-                    'question': "Question {}".format(question_number)
-                    if question_number else self.content.get_question(question_id).get('question'),
-                    'message': validation_message,
+        for field in self.field_table.fields:
+            if field.id in raw_errors_map:
+                errors_map.append((field.id, {
+                    'input_name': field.id,
+                    'question': field.label,
+                    'message': self.get_error_message(field.id, raw_errors_map[field.id]),
                 }))
 
         return errors_map
 
     def get_error_message(self, question_id, message_key):
-        for validation in self.content.get_question(question_id).get('validations', []):
-            if validation['name'] == message_key:
-                return validation['message']
+        validation_messages = self.field_table.by_id[question_id].validation_messages
+        if message_key in validation_messages:
+            return validation_messages[message_key]
         default_messages = {
             'answer_required': 'You need to answer this question.',
             'under_character_limit': 'Your answer must be no more than {} characters.'.format(self.character_limit),
@@ -66,7 +124,7 @@ class DeclarationValidator(object):
         raise NotImplementedError("only a subclass should be used")
 
     def all_fields(self):
-        return reduce(add, (section.get_question_ids() for section in self.content))
+        return list(self.field_table.ids)
 
     def fields_with_values(self):
         return set(key for key, value in self.answers.items()
@@ -91,27 +149,25 @@ class DeclarationValidator(object):
 
     def character_limit_errors(self):
         errors_map = {}
-        for question_id in self.all_fields():
-            if self.content.get_question(question_id).get('type') in ['text', 'textbox_large']:
-                answer = self.answers.get(question_id) or ''
-                if self.character_limit is not None and len(answer) > self.character_limit:
-                    errors_map[question_id] = "under_character_limit"
+        if self.character_limit is None:
+            return errors_map
+
+        for question_id in self.field_table.character_limited_ids:
+            answer = self.answers.get(question_id) or ''
+            if len(answer) > self.character_limit:
+                errors_map[question_id] = "under_character_limit"
 
         return errors_map
 
     def formatting_errors(self, answers):
         errors_map = {}
-        if self.email_validation_fields is not None and len(self.email_validation_fields) > 0:
-            for field in self.email_validation_fields:
-                if self.answers.get(field) is None or not re.match(EMAIL_REGEX, self.answers.get(field, '')):
-                    errors_map[field] = 'invalid_format'
-
-        if self.number_string_fields is not None and len(self.number_string_fields) > 0:
-            for field, length in self.number_string_fields:
-                if self.answers.get(field) is None or not re.match(
-                        r'^\d{{{0}}}$'.format(length), self.answers.get(field, '')
-                ):
-                    errors_map[field] = 'invalid_format'
+        for field in self.email_validation_fields or []:
+            if self.answers.get(field) is None or not EMAIL_PATTERN.match(self.answers.get(field, '')):
+                errors_map[field] = 'invalid_format'
+
+        for field, pattern in self.number_string_patterns():
+            if self.answers.get(field) is None or not pattern.match(self.answers.get(field, '')):
+                errors_map[field] = 'invalid_format'
         return errors_map
 
     def get_required_fields(self):
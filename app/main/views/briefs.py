@@ -11,10 +11,10 @@ import flask_featureflags as feature
 
 from dmapiclient import HTTPError
 from dmutils.forms import render_template_with_csrf
-from dmutils.email import send_email, EmailError
+from dmutils.email import EmailError
 from dmutils.documents import upload_service_documents
 from dmutils.s3 import S3
-from react.render import render_component
+from app.render import render_component
 
 import six
 import rollbar
@@ -22,16 +22,17 @@ import rollbar
 from ..helpers import login_required
 from ..helpers.briefs import (
     get_brief,
+    get_brief_context,
     is_supplier_selected_for_brief,
     is_supplier_not_eligible_for_brief,
     send_brief_clarification_question,
-    supplier_has_a_brief_response,
     supplier_is_assessed,
     supplier_is_unassessed
 )
 from ..helpers.frameworks import get_framework_and_lot
 from ...main import main, content_loader
 from ... import data_api_client
+from ...emails import send_email
 
 
 @main.route('/opportunities/<int:brief_id>/question-and-answer-session', methods=['GET'])
@@ -62,25 +63,27 @@ def ask_brief_clarification_question(brief_id):
 @main.route('/opportunities/<int:brief_id>/responses/create', methods=['GET'])
 @login_required
 def brief_response(brief_id):
-    brief = get_brief(data_api_client, brief_id)
+    context = get_brief_context(data_api_client, brief_id, current_user.supplier_code)
+    brief = context.brief
     if brief['status'] != 'live':
         return render_template(
             "briefs/brief_closed_error.html"
         ), 400
 
-    if not is_supplier_selected_for_brief(data_api_client, current_user, brief):
+    if not is_supplier_selected_for_brief(data_api_client, current_user, brief, supplier=context.supplier):
         return _render_not_selected_for_brief_error_page()
 
-    ineligible = is_supplier_not_eligible_for_brief(data_api_client, current_user.supplier_code, brief)
+    ineligible = is_supplier_not_eligible_for_brief(
+        data_api_client, current_user.supplier_code, brief, supplier=context.supplier)
     if ineligible:
         return _render_error_page(ineligible, brief)
 
-    if supplier_has_a_brief_response(data_api_client, current_user.supplier_code, brief_id):
+    if context.has_responded:
         flash('already_applied', 'error')
         return redirect(url_for(".view_response_result", brief_id=brief_id))
 
     if brief['frameworkSlug'] == 'digital-marketplace':
-        current_supplier = data_api_client.req.suppliers(current_user.supplier_code).get()
+        current_supplier = {'supplier': context.supplier}
         if brief['lotSlug'] == 'digital-outcome':
             if len(current_supplier['supplier']['domains'].get('assessed', [])) == 0:
                 return redirect(url_for(".choose_assessment", brief_id=brief_id))
@@ -155,21 +158,23 @@ def send_thank_you_email_to_responders(brief, brief_response, brief_response_url
 def submit_brief_response(brief_id):
     """Hits up the data API to create a new brief response."""
 
-    brief = get_brief(data_api_client, brief_id)
+    context = get_brief_context(data_api_client, brief_id, current_user.supplier_code)
+    brief = context.brief
 
     if brief['status'] != 'live':
         return render_template(
             "briefs/brief_closed_error.html"
         ), 400
 
-    if not is_supplier_selected_for_brief(data_api_client, current_user, brief):
+    if not is_supplier_selected_for_brief(data_api_client, current_user, brief, supplier=context.supplier):
         return _render_not_selected_for_brief_error_page()
 
-    ineligible = is_supplier_not_eligible_for_brief(data_api_client, current_user.supplier_code, brief)
+    ineligible = is_supplier_not_eligible_for_brief(
+        data_api_client, current_user.supplier_code, brief, supplier=context.supplier)
     if ineligible:
         return _render_error_page(ineligible, brief, clarification_question=True)
 
-    if supplier_has_a_brief_response(data_api_client, current_user.supplier_code, brief_id):
+    if context.has_responded:
         flash('already_applied', 'error')
         return redirect(url_for(".view_response_result", brief_id=brief_id))
 
@@ -239,19 +244,18 @@ def submit_brief_response(brief_id):
 @main.route('/opportunities/<int:brief_id>/responses/result')
 @login_required
 def view_response_result(brief_id):
-    brief = get_brief(data_api_client, brief_id, allowed_statuses=['live'])
+    context = get_brief_context(data_api_client, brief_id, current_user.supplier_code, allowed_statuses=['live'])
+    brief = context.brief
 
-    if not is_supplier_selected_for_brief(data_api_client, current_user, brief):
+    if not is_supplier_selected_for_brief(data_api_client, current_user, brief, supplier=context.supplier):
         return _render_not_selected_for_brief_error_page()
 
-    ineligible = is_supplier_not_eligible_for_brief(data_api_client, current_user.supplier_code, brief)
+    ineligible = is_supplier_not_eligible_for_brief(
+        data_api_client, current_user.supplier_code, brief, supplier=context.supplier)
     if ineligible:
         return _render_error_page(ineligible, brief, clarification_question=True)
 
-    brief_response = data_api_client.find_brief_responses(
-        brief_id=brief_id,
-        supplier_code=current_user.supplier_code
-    )['briefResponses']
+    brief_response = context.brief_responses
 
     # A check for training lot is required because essentialRequirements is not
     # included in training responses
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from functools import partial
 from itertools import chain
 
 from dateutil.parser import parse as date_parse
@@ -9,11 +10,10 @@ import rollbar
 
 from dmapiclient import APIError
 from dmapiclient.audit import AuditTypes
-from dmutils.email import send_email, EmailError
+from dmutils.email import EmailError
 from dmcontent.formats import format_service_price
 from dmutils.formats import DateFormatter
 from dmutils.forms import render_template_with_csrf
-from dmutils import s3
 from dmutils.documents import (
     RESULT_LETTER_FILENAME, AGREEMENT_FILENAME, SIGNED_AGREEMENT_PREFIX, COUNTERSIGNED_AGREEMENT_FILENAME,
     SIGNATURE_PAGE_FILENAME, get_agreement_document_path, get_signed_url, get_extension, file_is_less_than_5mb,
@@ -21,10 +21,14 @@ from dmutils.documents import (
 )
 
 from ... import data_api_client
+from ...emails import send_bulk_email, send_email
 from ...main import main, content_loader
 from ..helpers import hash_email, login_required
+from ..helpers.buckets import get_bucket
+from ..helpers.communications import get_communications_index
+from ..helpers.concurrency import fetch_concurrently
 from ..helpers.frameworks import (
-    get_declaration_status, get_last_modified_from_first_matching_file, register_interest_in_framework,
+    get_declaration_status, register_interest_in_framework,
     get_supplier_on_framework_from_info, get_declaration_status_from_info, get_supplier_framework_info,
     get_framework, get_framework_and_lot, count_drafts_by_lot, get_statuses_for_lot,
     countersigned_framework_agreement_exists_in_bucket, return_supplier_framework_info_if_on_framework_or_abort,
@@ -42,31 +46,43 @@ CLARIFICATION_QUESTION_NAME = 'clarification_question'
 @main.route('/frameworks/<framework_slug>', methods=['GET', 'POST'])
 @login_required
 def framework_dashboard(framework_slug):
-    framework = get_framework(data_api_client, framework_slug)
     if request.method == 'POST':
+        framework = get_framework(data_api_client, framework_slug)
         register_interest_in_framework(data_api_client, framework_slug)
         supplier_users = data_api_client.find_users(supplier_code=current_user.supplier_code)
 
-        try:
-            email_body = render_template('emails/{}_application_started.html'.format(framework_slug))
-            send_email(
-                [user['emailAddress'] for user in supplier_users['users'] if user['active']],
-                email_body,
-                'You have started your {} application'.format(framework['name']),
-                current_app.config['CLARIFICATION_EMAIL_FROM'],
-                current_app.config['CLARIFICATION_EMAIL_NAME'],
-                ['{}-application-started'.format(framework_slug)]
-            )
-        except EmailError as e:
-            rollbar.report_exc_info()
+        failures = send_bulk_email(
+            [(user['emailAddress'], {}) for user in supplier_users['users'] if user['active']],
+            'emails/{}_application_started.html'.format(framework_slug),
+            'You have started your {} application'.format(framework['name']),
+            current_app.config['CLARIFICATION_EMAIL_FROM'],
+            current_app.config['CLARIFICATION_EMAIL_NAME'],
+            ['{}-application-started'.format(framework_slug)]
+        )
+        if failures:
+            rollbar.report_message('Application started email failed to send', 'error')
             current_app.logger.error(
                 "Application started email failed to send: {error}, supplier_code: {supplier_code}",
-                extra={'error': six.text_type(e), 'supplier_code': current_user.supplier_code}
+                extra={'error': '; '.join(set(failures.values())), 'supplier_code': current_user.supplier_code}
             )
 
-    drafts, complete_drafts = get_drafts(data_api_client, framework_slug)
+    # these lookups are independent of each other, so run them side by side; the framework goes first so that a
+    # missing framework is a 404 whatever else fails
+    fetched = fetch_concurrently(
+        ('framework', partial(get_framework, data_api_client, framework_slug)),
+        ('drafts', partial(get_drafts, data_api_client, framework_slug)),
+        ('supplier_framework_info', partial(get_supplier_framework_info, data_api_client, framework_slug)),
+        ('communications', partial(get_communications_index, framework_slug)),
+        ('countersigned', partial(
+            countersigned_framework_agreement_exists_in_bucket,
+            framework_slug,
+            current_app.config['DM_AGREEMENTS_BUCKET']
+        )),
+    )
+    framework = fetched['framework']
+    drafts, complete_drafts = fetched['drafts']
 
-    supplier_framework_info = get_supplier_framework_info(data_api_client, framework_slug)
+    supplier_framework_info = fetched['supplier_framework_info']
     declaration_status = get_declaration_status_from_info(supplier_framework_info)
     supplier_is_on_framework = get_supplier_on_framework_from_info(supplier_framework_info)
 
@@ -74,8 +90,7 @@ def framework_dashboard(framework_slug):
     if declaration_status == 'unstarted' and framework['status'] == 'live':
         abort(404)
 
-    key_list = s3.S3(current_app.config['DM_COMMUNICATIONS_BUCKET']).list(framework_slug, load_timestamps=True)
-    key_list.reverse()
+    communications = fetched['communications']
 
     first_page = content_loader.get_manifest(
         framework_slug, 'declaration'
@@ -85,24 +100,20 @@ def framework_dashboard(framework_slug):
     supplier_pack_filename = '{}-supplier-pack.zip'.format(framework_slug)
     result_letter_filename = RESULT_LETTER_FILENAME
     countersigned_agreement_file = None
-    if countersigned_framework_agreement_exists_in_bucket(framework_slug, current_app.config['DM_AGREEMENTS_BUCKET']):
+    if fetched['countersigned']:
         countersigned_agreement_file = COUNTERSIGNED_AGREEMENT_FILENAME
 
     application_made = supplier_is_on_framework or (len(complete_drafts) > 0 and declaration_status == 'complete')
     lots_with_completed_drafts = [lot for lot in framework['lots'] if count_drafts_by_lot(complete_drafts, lot['slug'])]
 
     last_modified = {
-        'supplier_pack': get_last_modified_from_first_matching_file(
-            key_list, framework_slug, "communications/{}".format(supplier_pack_filename)
-        ),
-        'supplier_updates': get_last_modified_from_first_matching_file(
-            key_list, framework_slug, "communications/updates/"
-        )
+        'supplier_pack': communications.last_modified("communications/{}".format(supplier_pack_filename)),
+        'supplier_updates': communications.last_modified("communications/updates/"),
     }
 
     # if supplier has returned agreement for framework with framework_agreement_version, show contract_submitted page
     if supplier_is_on_framework and framework['frameworkAgreementVersion'] and supplier_framework_info['agreementReturned']:  # noqa
-        agreements_bucket = s3.S3(current_app.config['DM_AGREEMENTS_BUCKET'])
+        agreements_bucket = get_bucket(current_app.config['DM_AGREEMENTS_BUCKET'])
         signature_page = get_most_recently_uploaded_agreement_file_or_none(agreements_bucket, framework_slug)
 
         return render_template(
@@ -210,7 +221,7 @@ def framework_submission_services(framework_slug, lot_slug):
 
     for draft in chain(drafts, complete_drafts):
         draft['priceString'] = format_service_price(draft)
-        content = content_loader.get_manifest(framework_slug, 'edit_submission').filter(draft)
+        content = content_loader.get_filtered_manifest(framework_slug, 'edit_submission', draft)
         sections = content.summary(draft)
 
         unanswered_required, unanswered_optional = count_unanswered_questions(sections)
@@ -235,7 +246,8 @@ def framework_submission_services(framework_slug, lot_slug):
 def framework_supplier_declaration(framework_slug, section_id=None):
     framework = get_framework(data_api_client, framework_slug, allowed_statuses=['open'])
 
-    content = content_loader.get_manifest(framework_slug, 'declaration')
+    # declarations don't depend on any context, so every request shares one manifest and its validation field table
+    content = content_loader.get_filtered_manifest(framework_slug, 'declaration', {})
     status_code = 200
 
     if section_id is None:
@@ -266,17 +278,12 @@ def framework_supplier_declaration(framework_slug, section_id=None):
         submitted_answers = section.get_data(request.form)
         all_answers = dict(saved_answers, **submitted_answers)
 
-        validator = get_validator(framework, content, submitted_answers)
-        errors = validator.get_error_messages_for_page(section)
+        errors, complete = get_validator(framework, content, all_answers).validate_page(section)
 
         if len(errors) > 0:
             status_code = 400
         else:
-            validator = get_validator(framework, content, all_answers)
-            if validator.get_error_messages():
-                all_answers.update({"status": "started"})
-            else:
-                all_answers.update({"status": "complete"})
+            all_answers.update({"status": "complete" if complete else "started"})
             try:
                 data_api_client.set_supplier_declaration(
                     current_user.supplier_code,
@@ -318,7 +325,7 @@ def framework_supplier_declaration(framework_slug, section_id=None):
 @main.route('/frameworks/<framework_slug>/files/<path:filepath>', methods=['GET'])
 @login_required
 def download_supplier_file(framework_slug, filepath):
-    uploader = s3.S3(current_app.config['DM_COMMUNICATIONS_BUCKET'])
+    uploader = get_bucket(current_app.config['DM_COMMUNICATIONS_BUCKET'])
     url = get_signed_document_url(uploader, "{}/communications/{}".format(framework_slug, filepath))
     if not url:
         abort(404)
@@ -333,7 +340,7 @@ def download_agreement_file(framework_slug, document_name):
     if supplier_framework_info is None or not supplier_framework_info.get("declaration"):
         abort(404)
 
-    agreements_bucket = s3.S3(current_app.config['DM_AGREEMENTS_BUCKET'])
+    agreements_bucket = get_bucket(current_app.config['DM_AGREEMENTS_BUCKET'])
     path = get_agreement_document_path(framework_slug, current_user.supplier_code, document_name)
     url = get_signed_url(agreements_bucket, path, current_app.config['DM_ASSETS_URL'])
     if not url:
@@ -352,16 +359,11 @@ def framework_updates(framework_slug, error_message=None, default_textbox_value=
                                    'user_id': current_user.id,
                                    'supplier_code': current_user.supplier_code})
 
-    communications_bucket = s3.S3(current_app.config['DM_COMMUNICATIONS_BUCKET'])
-    file_list = communications_bucket.list('{}/communications/updates/'.format(framework_slug), load_timestamps=True)
+    communications = get_communications_index(framework_slug)
     files = {
-        'communications': [],
-        'clarifications': [],
+        'communications': communications.updates.get('communications', []),
+        'clarifications': communications.updates.get('clarifications', []),
     }
-    for file in file_list:
-        path_parts = file['path'].split('/')
-        file['path'] = '/'.join(path_parts[2:])
-        files[path_parts[3]].append(file)
 
     status_code = 200 if not error_message else 400
     return render_template_with_csrf(
@@ -549,7 +551,7 @@ def upload_framework_agreement(framework_slug):
             agreement_filename=AGREEMENT_FILENAME
         )
 
-    agreements_bucket = s3.S3(current_app.config['DM_AGREEMENTS_BUCKET'])
+    agreements_bucket = get_bucket(current_app.config['DM_AGREEMENTS_BUCKET'])
     extension = get_extension(request.files['agreement'].filename)
 
     path = get_agreement_document_path(
@@ -656,7 +658,7 @@ def signer_details(framework_slug):
 def signature_upload(framework_slug):
     framework = get_framework(data_api_client, framework_slug)
     return_supplier_framework_info_if_on_framework_or_abort(data_api_client, framework_slug)
-    agreements_bucket = s3.S3(current_app.config['DM_AGREEMENTS_BUCKET'])
+    agreements_bucket = get_bucket(current_app.config['DM_AGREEMENTS_BUCKET'])
     signature_page = get_most_recently_uploaded_agreement_file_or_none(agreements_bucket, framework_slug)
     upload_error = None
 
@@ -713,7 +715,7 @@ def signature_upload(framework_slug):
 def contract_review(framework_slug):
     framework = get_framework(data_api_client, framework_slug)
     supplier_framework = return_supplier_framework_info_if_on_framework_or_abort(data_api_client, framework_slug)
-    agreements_bucket = s3.S3(current_app.config['DM_AGREEMENTS_BUCKET'])
+    agreements_bucket = get_bucket(current_app.config['DM_AGREEMENTS_BUCKET'])
     signature_page = get_most_recently_uploaded_agreement_file_or_none(agreements_bucket, framework_slug)
 
     # if supplier_framework doesn't have a name or a role or the agreement file, then 404
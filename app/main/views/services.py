@@ -5,12 +5,12 @@ import flask_featureflags
 from ... import data_api_client
 from ...main import main, content_loader
 from ..helpers import login_required
+from ..helpers.buckets import get_bucket
 from ..helpers.services import is_service_associated_with_supplier, \
     get_signed_document_url, count_unanswered_questions, get_next_section_name
 from ..helpers.frameworks import get_framework_and_lot, get_declaration_status
 
 from dmapiclient import HTTPError
-from dmutils import s3
 from dmutils.documents import upload_service_documents
 from dmutils.forms import render_template_with_csrf
 
@@ -45,7 +45,7 @@ def edit_service(service_id):
 
     framework = data_api_client.get_framework(service['frameworkSlug'])['frameworks']
 
-    content = content_loader.get_manifest(framework['slug'], 'edit_service').filter(service)
+    content = content_loader.get_filtered_manifest(framework['slug'], 'edit_service', service)
     remove_requested = True if request.args.get('remove_requested') else False
 
     return render_template_with_csrf(
@@ -104,7 +104,7 @@ def edit_section(service_id, section_id):
     if not is_service_associated_with_supplier(service):
         abort(404)
 
-    content = content_loader.get_manifest('g-cloud-6', 'edit_service').filter(service)
+    content = content_loader.get_filtered_manifest('g-cloud-6', 'edit_service', service)
     section = content.get_section(section_id)
     if section is None or not section.editable:
         abort(404)
@@ -129,7 +129,7 @@ def update_section(service_id, section_id):
     if not is_service_associated_with_supplier(service):
         abort(404)
 
-    content = content_loader.get_manifest('g-cloud-6', 'edit_service').filter(service)
+    content = content_loader.get_filtered_manifest('g-cloud-6', 'edit_service', service)
     section = content.get_section(section_id)
     if section is None or not section.editable:
         abort(404)
@@ -166,9 +166,7 @@ def start_new_draft_service(framework_slug, lot_slug):
 
     framework, lot = get_framework_and_lot(data_api_client, framework_slug, lot_slug, allowed_statuses=['open'])
 
-    content = content_loader.get_manifest(framework_slug, 'edit_submission').filter(
-        {'lot': lot['slug']}
-    )
+    content = content_loader.get_filtered_manifest(framework_slug, 'edit_submission', {'lot': lot['slug']})
 
     section = content.get_section(content.get_next_editable_section_id())
 
@@ -187,9 +185,7 @@ def create_new_draft_service(framework_slug, lot_slug):
 
     framework, lot = get_framework_and_lot(data_api_client, framework_slug, lot_slug, allowed_statuses=['open'])
 
-    content = content_loader.get_manifest(framework_slug, 'edit_submission').filter(
-        {'lot': lot['slug']}
-    )
+    content = content_loader.get_filtered_manifest(framework_slug, 'edit_submission', {'lot': lot['slug']})
 
     section = content.get_section(content.get_next_editable_section_id())
 
@@ -235,9 +231,7 @@ def copy_draft_service(framework_slug, lot_slug, service_id):
     if not is_service_associated_with_supplier(draft):
         abort(404)
 
-    content = content_loader.get_manifest(framework_slug, 'edit_submission').filter(
-        {'lot': lot['slug']}
-    )
+    content = content_loader.get_filtered_manifest(framework_slug, 'edit_submission', {'lot': lot['slug']})
 
     draft_copy = data_api_client.copy_draft_service(
         service_id,
@@ -327,7 +321,7 @@ def service_submission_document(framework_slug, supplier_code, document_name):
     if current_user.supplier_code != supplier_code:
         abort(404)
 
-    uploader = s3.S3(current_app.config['DM_SUBMISSIONS_BUCKET'])
+    uploader = get_bucket(current_app.config['DM_SUBMISSIONS_BUCKET'])
     s3_url = get_signed_document_url(uploader,
                                      "{}/submissions/{}/{}".format(framework_slug, supplier_code, document_name))
     if not s3_url:
@@ -353,7 +347,7 @@ def view_service_submission(framework_slug, lot_slug, service_id):
     if not is_service_associated_with_supplier(draft):
         abort(404)
 
-    content = content_loader.get_manifest(framework['slug'], 'edit_submission').filter(draft)
+    content = content_loader.get_filtered_manifest(framework['slug'], 'edit_submission', draft)
 
     sections = content.summary(draft)
 
@@ -396,7 +390,7 @@ def edit_service_submission(framework_slug, lot_slug, service_id, section_id, qu
     if not is_service_associated_with_supplier(draft):
         abort(404)
 
-    content = content_loader.get_manifest(framework_slug, 'edit_submission').filter(draft)
+    content = content_loader.get_filtered_manifest(framework_slug, 'edit_submission', draft)
     section = content.get_section(section_id)
     if section and (question_slug is not None):
         section = section.get_question_as_section(question_slug)
@@ -436,7 +430,7 @@ def update_section_submission(framework_slug, lot_slug, service_id, section_id,
     if not is_service_associated_with_supplier(draft):
         abort(404)
 
-    content = content_loader.get_manifest(framework_slug, 'edit_submission').filter(draft)
+    content = content_loader.get_filtered_manifest(framework_slug, 'edit_submission', draft)
     section = content.get_section(section_id)
     if section and (question_slug is not None):
         section = section.get_question_as_section(question_slug)
@@ -448,7 +442,7 @@ def update_section_submission(framework_slug, lot_slug, service_id, section_id,
     document_errors = None
     update_data = section.get_data(request.form)
 
-    uploader = s3.S3(current_app.config['DM_SUBMISSIONS_BUCKET'])
+    uploader = get_bucket(current_app.config['DM_SUBMISSIONS_BUCKET'])
     documents_url = url_for('.dashboard', _external=True) + '/assets/'
     uploaded_documents, document_errors = upload_service_documents(
         uploader, documents_url, draft, request.files, section,
@@ -517,7 +511,7 @@ def remove_subsection(framework_slug, lot_slug, service_id, section_id, question
     if not is_service_associated_with_supplier(draft):
         abort(404)
 
-    content = content_loader.get_manifest(framework_slug, 'edit_submission').filter(draft)
+    content = content_loader.get_filtered_manifest(framework_slug, 'edit_submission', draft)
     section = content.get_section(section_id)
     containing_section = section
     if section and (question_slug is not None):
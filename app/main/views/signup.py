@@ -3,7 +3,7 @@ import rollbar
 from flask import render_template, request, url_for, current_app, abort, jsonify, redirect, Response, flash
 from flask_login import current_user, login_user
 from app.main import main
-from react.render import render_component
+from app.render import render_component
 from react.response import from_response, validate_form_data
 from dmapiclient import APIError
 from dmutils.email import EmailError, send_email
@@ -26,7 +26,7 @@ from ..helpers import debug_only, hash_email, login_required
 from .users import get_current_suppliers_users
 
 from react.response import from_response, validate_form_data
-from react.render import render_component
+from app.render import render_component
 from dmutils.forms import DmForm
 from dmutils.logging import notify_team
 
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+import rollbar
+import six
+from flask import current_app
+from requests.adapters import HTTPAdapter
+
+import react.render_server
+from react.exceptions import RenderServerError
+from react.render import render_component as react_render_component
+
+from app.resilience import CircuitBreaker, CircuitOpenError
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+class RenderCache(object):
+    """A thread-safe in-process LRU cache of rendered React components whose entries also expire after `timeout`.
+
+    :param size: the most components kept; 0 disables the cache
+    :param timeout: seconds a rendered component is reused for
+    """
+
+    def __init__(self, size, timeout, clock=time.time):
+        self.size = size
+        self.timeout = timeout
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[0] <= self._clock():
+                self.misses += 1
+                return None
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, component):
+        if not self.size:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self._clock() + self.timeout, component)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def render_cache_key(path, props, to_static_markup):
+    """The cache key for a render: the bundle, a hash of the props in canonical form and the deployed bundle version."""
+    serialized_props = json.dumps(props, sort_keys=True, separators=(',', ':'), default=six.text_type)
+    return (
+        path,
+        hashlib.sha1(serialized_props.encode('utf-8')).hexdigest(),
+        bool(to_static_markup),
+        current_app.config['REACT_BUNDLE_URL'],
+        current_app.config['REACT_BUNDLE_VERSION'],
+    )
+
+
+def render_component(path, props=None, to_static_markup=False, **kwargs):
+    """Render a React component, reusing an earlier render of the same bundle with the same props if there is one.
+
+    Takes the same arguments as :func:`react.render.render_component`. Renders made with extra arguments such as
+    request headers may depend on more than the props, so they always go to the render service.
+
+    If the render service fails or takes longer than its timeouts allow, a :class:`ClientRenderedComponent` is
+    returned instead so the page can be served straight away and rendered in the browser.
+    """
+    cache = current_app.extensions.get('react_render_cache')
+    if cache is None or not cache.size or kwargs:
+        return _render_or_fall_back(path, props, to_static_markup, **kwargs)
+
+    key = render_cache_key(path, props, to_static_markup)
+    component = cache.get(key)
+    if component is None:
+        component = _render_or_fall_back(path, props, to_static_markup)
+        if not isinstance(component, ClientRenderedComponent):
+            cache.set(key, component)
+    return component
+
+
+class ClientRenderedComponent(object):
+    """Stands in for a server-side render that couldn't be done in time: no markup, just the props for the bundle.
+
+    The bundle and slug come from the last successful render of the same component in this process if there is one,
+    as the render service knows them best, and otherwise from REACT_BUNDLE_URL and the bundle's path.
+    """
+
+    client_rendered = True
+
+    def __init__(self, path, props, last_render=None):
+        self._path = path
+        self._props = props
+        self._last_render = last_render
+
+    def get_props(self):
+        return self._props
+
+    def get_bundle(self):
+        if self._last_render is not None:
+            return self._last_render.get_bundle()
+        return '{}/{}'.format(current_app.config['REACT_BUNDLE_URL'].rstrip('/'), self._path.lstrip('/'))
+
+    def get_slug(self):
+        if self._last_render is not None:
+            return self._last_render.get_slug()
+        return os.path.splitext(os.path.basename(self._path))[0]
+
+    def get_vendor_bundle(self):
+        if self._last_render is not None:
+            return self._last_render.get_vendor_bundle()
+        return None
+
+    def get_file(self, name):
+        """The bundle's extra file called `name` (eg its 'stylesheet'), if an earlier render said what it is."""
+        if self._last_render is not None:
+            return self._last_render.get_file(name)
+        return None
+
+    def __str__(self):
+        return ''
+
+    def __unicode__(self):
+        return u''
+
+    def __html__(self):
+        return u''
+
+
+def _render_or_fall_back(path, props, to_static_markup, **kwargs):
+    breaker = current_app.extensions['react_render_breaker']
+    last_renders = current_app.extensions['react_last_renders']
+    try:
+        component = breaker.call(react_render_component, path, props, to_static_markup, **kwargs)
+    except (CircuitOpenError, RenderServerError, requests.RequestException) as e:
+        if not isinstance(e, CircuitOpenError):
+            rollbar.report_exc_info()
+        current_app.logger.warning('Rendering {} in the browser instead: {}'.format(path, e))
+        return ClientRenderedComponent(path, props, last_renders.get(path))
+
+    last_renders[path] = component
+    return component
+
+
+class RenderTransport(object):
+    """Stands in for the ``requests`` module in react's render server, so renders give up after set timeouts.
+
+    react's render server posts through the module-level ``requests.post`` with no timeout of its own. ``post`` here
+    adds separate connect and read timeouts, and everything else is passed through to ``requests``.
+    """
+
+    def __init__(self, connect_timeout, read_timeout):
+        self.timeout = (connect_timeout, read_timeout)
+
+    def post(self, url, **kwargs):
+        kwargs['timeout'] = self.timeout
+        return self._post(url, **kwargs)
+
+    def _post(self, url, **kwargs):
+        return requests.post(url, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+    def stats(self):
+        return None
+
+
+class PooledRenderTransport(RenderTransport):
+    """A :class:`RenderTransport` that sends renders over one keep-alive :class:`requests.Session`.
+
+    The module-level ``requests.post`` sets up (and tears down) a TLS connection for every render; this shares a
+    connection-pooled session instead.
+    """
+
+    def __init__(self, pool_size, connect_timeout, read_timeout):
+        super(PooledRenderTransport, self).__init__(connect_timeout, read_timeout)
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+        self.pool_size = pool_size
+
+    def _post(self, url, **kwargs):
+        return self.session.post(url, **kwargs)
+
+    def stats(self):
+        """Connection counts for each host in the pool, to size REACT_RENDER_POOL_SIZE against the worker threads."""
+        pools = self.adapter.poolmanager.pools
+        return {
+            'pool_size': self.pool_size,
+            'hosts': [
+                {
+                    'host': pool.host,
+                    'connections_opened': pool.num_connections,
+                    'requests': pool.num_requests,
+                    'idle_connections': pool.pool.qsize() if pool.pool else 0,
+                }
+                for pool in (pools[key] for key in pools.keys())
+            ],
+        }
+
+
+def render_stats():
+    """Render cache and connection pool figures for the status page."""
+    cache = current_app.extensions.get('react_render_cache')
+    return {
+        'breaker': current_app.extensions['react_render_breaker'].stats(),
+        'cache': {'size': len(cache), 'hits': cache.hits, 'misses': cache.misses} if cache is not None else None,
+        'pool': _transport.stats() if _transport is not None else None,
+    }
+
+
+def init_app(application):
+    application.extensions['react_render_cache'] = RenderCache(
+        application.config['REACT_RENDER_CACHE_SIZE'],
+        application.config['REACT_RENDER_CACHE_TIMEOUT'],
+    )
+    application.extensions['react_render_breaker'] = CircuitBreaker(
+        application.config['REACT_RENDER_BREAKER_THRESHOLD'],
+        application.config['REACT_RENDER_BREAKER_RESET_TIMEOUT'],
+        is_failure=lambda e: isinstance(e, (RenderServerError, requests.RequestException)),
+    )
+    # the last good render of each bundle, which a ClientRenderedComponent prefers to take the bundle details from
+    application.extensions['react_last_renders'] = {}
+
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            timeouts = (
+                application.config['REACT_RENDER_CONNECT_TIMEOUT'],
+                application.config['REACT_RENDER_READ_TIMEOUT'],
+            )
+            if application.config['REACT_RENDER_POOL_SIZE']:
+                _transport = PooledRenderTransport(application.config['REACT_RENDER_POOL_SIZE'], *timeouts)
+            else:
+                _transport = RenderTransport(*timeouts)
+            react.render_server.requests = _transport
@@ -0,0 +1,140 @@
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency that a :class:`CircuitBreaker` has stopped calling."""
+
+
+class CircuitBreaker(object):
+    """Stops calling a failing dependency for a while so requests fail fast instead of queueing up behind it.
+
+    After `failure_threshold` consecutive failures the breaker opens and :meth:`call` raises CircuitOpenError
+    without calling anything. Once `reset_timeout` seconds have passed one call is let through as a probe: if it
+    succeeds the breaker closes again, otherwise it stays open for another `reset_timeout`.
+
+    :param is_failure: decides whether an exception counts as the dependency failing (eg a 404 from an API
+        doesn't); exceptions that don't count are re-raised without affecting the breaker
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold, reset_timeout, is_failure=lambda e: True, clock=time.time):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._probing or self._clock() >= self._opened_at + self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self):
+        """Whether a call may go ahead now. In the half-open state only one probe is allowed at a time."""
+        return self._allow()[0]
+
+    def _allow(self):
+        # (whether the call may go ahead, whether it is the probe)
+        with self._lock:
+            if self._opened_at is None:
+                return True, False
+            if self._probing or self._clock() < self._opened_at + self.reset_timeout:
+                return False, False
+            self._probing = True
+            return True, True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._probing = False
+
+    def _end_probe(self):
+        with self._lock:
+            self._probing = False
+
+    def call(self, func, *args, **kwargs):
+        allowed, probe = self._allow()
+        if not allowed:
+            raise CircuitOpenError('Circuit open after {} failures'.format(self._failures))
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        else:
+            self.record_success()
+            return result
+        finally:
+            # a probe that ends without an outcome (eg interrupted by a BaseException) mustn't leave the breaker
+            # half-open with no more probes let through
+            if probe:
+                self._end_probe()
+
+    def stats(self):
+        return {'state': self.state, 'failures': self._failures}
+
+
+class BulkheadFullError(Exception):
+    """Raised when a :class:`Bulkhead` has no free slot within its timeout."""
+
+
+class Bulkhead(object):
+    """Limits how many calls to a dependency can be in flight at once, so a slow dependency can't tie up every thread.
+
+    Callers wait up to `timeout` seconds for a free slot and then get BulkheadFullError.
+    """
+
+    def __init__(self, max_concurrent, timeout, clock=time.time):
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self._clock = clock
+        self._condition = threading.Condition()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def acquire(self):
+        deadline = self._clock() + self.timeout
+        with self._condition:
+            while self.in_flight >= self.max_concurrent:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    self.rejected += 1
+                    raise BulkheadFullError('{} calls already in flight'.format(self.in_flight))
+                self._condition.wait(remaining)
+            self.in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def call(self, func, *args, **kwargs):
+        self.acquire()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.release()
+
+    def stats(self):
+        return {'max_concurrent': self.max_concurrent, 'in_flight': self.in_flight, 'rejected': self.rejected}
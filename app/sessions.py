@@ -0,0 +1,134 @@
+import pickle
+import zlib
+
+import six
+from flask import g, has_request_context
+from flask.json.tag import JSONTag, TaggedJSONSerializer
+from flask_kvsession import KVSession, KVSessionInterface
+from simplekv.memory.redisstore import RedisStore
+
+# the first byte of a stored session says how the rest is encoded
+FORMAT_JSON = b'\x01'
+FORMAT_ZLIB_JSON = b'\x02'
+# sessions smaller than this rarely shrink when compressed
+COMPRESS_THRESHOLD = 256
+
+IMMUTABLE_TYPES = six.string_types + six.integer_types + (bytes, bool, float, type(None))
+
+
+class SessionStore(RedisStore):
+    """A Redis session store for Flask-KVSession that avoids needless round trips.
+
+    Reading a session also refreshes its TTL, in the same pipelined round trip. Flask-KVSession writes the session
+    back whenever anything assigns to it, even if nothing changed (Flask-Login does this on every request), so
+    writes of exactly what was read earlier in the request are skipped: the key is already there with a fresh TTL.
+
+    :param ttl: seconds a session is kept in Redis after it was last read or written
+    """
+
+    def __init__(self, redis, ttl):
+        super(SessionStore, self).__init__(redis)
+        self.ttl = int(ttl)
+
+    def _get(self, key):
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.expire(key, self.ttl)
+        value, _ = pipe.execute()
+
+        if value is None:
+            raise KeyError(key)
+        if has_request_context():
+            g.setdefault('_session_store_reads', {})[key] = value
+        return value
+
+    def _put(self, key, value, ttl_secs):
+        if has_request_context() and g.get('_session_store_reads', {}).get(key) == value:
+            return key
+        return super(SessionStore, self)._put(key, value, ttl_secs)
+
+
+class PassText(JSONTag):
+    """Stores Python 2 ``str`` text as a plain JSON string, where Flask would store it base64 encoded as bytes."""
+
+    __slots__ = ()
+
+    def check(self, value):
+        if not isinstance(value, bytes) or isinstance(value, six.text_type):
+            return False
+        try:
+            value.decode('utf-8')
+        except UnicodeDecodeError:
+            return False
+        return True
+
+    def to_json(self, value):
+        return value.decode('utf-8')
+
+    tag = to_json
+
+
+def session_serializer():
+    serializer = TaggedJSONSerializer()
+    if six.PY2:
+        serializer.register(PassText, index=0)
+    return serializer
+
+
+class SessionCodec(object):
+    """Encodes sessions as compact tagged JSON (as Flask's cookie sessions do) behind a one-byte format version.
+
+    Larger sessions are compressed with zlib. Sessions stored by Flask-KVSession's default pickle encoding can still
+    be read, so existing sessions survive the switch and are rewritten in the new format when they next change.
+    """
+
+    serializer = session_serializer()
+
+    def dumps(self, session):
+        data = self.serializer.dumps(session)
+        if isinstance(data, six.text_type):
+            data = data.encode('utf-8')
+        if len(data) >= COMPRESS_THRESHOLD:
+            compressed = zlib.compress(data)
+            if len(compressed) < len(data):
+                return FORMAT_ZLIB_JSON + compressed
+        return FORMAT_JSON + data
+
+    def loads(self, data):
+        encoding, payload = data[:1], data[1:]
+        if encoding == FORMAT_JSON:
+            return self.serializer.loads(payload)
+        if encoding == FORMAT_ZLIB_JSON:
+            return self.serializer.loads(zlib.decompress(payload))
+        return pickle.loads(data)
+
+
+class TrackedSession(KVSession):
+    """A session that only counts as modified when its contents actually change.
+
+    Assigning a key the (immutable) value it already has doesn't mark the session as modified, so it isn't written
+    back to the store. Mutable values can be changed in place, so assigning one always marks the session modified.
+    """
+
+    def __setitem__(self, key, value):
+        if key in self and _unchanged(self[key], value):
+            return
+        super(TrackedSession, self).__setitem__(key, value)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+
+def _unchanged(old, new):
+    if not isinstance(new, IMMUTABLE_TYPES) or old != new:
+        return False
+    # eg True == 1, but the session would store something different; str and unicode do store the same
+    return type(old) == type(new) or (isinstance(old, six.string_types) and isinstance(new, six.string_types))
+
+
+class SessionInterface(KVSessionInterface):
+    """Flask-KVSession's session handling, with compact encoding and change tracking."""
+
+    serialization_method = SessionCodec()
+    session_class = TrackedSession
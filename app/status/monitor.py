@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from flask import current_app
+
+from .. import data_api_client
+from ..main.helpers.buckets import get_bucket
+from ..render import render_stats
+
+
+class StatusMonitor(object):
+    """Keeps a snapshot of the health of the app's dependencies, refreshed in a background thread.
+
+    The status page serves the snapshot, so however often it is polled each dependency is only checked once every
+    `refresh_interval` seconds. The first round of checks runs in the background as soon as :meth:`start` is called;
+    a snapshot asked for before that round has finished waits for it rather than failing. With a `refresh_interval`
+    of 0 the checks run on every :meth:`snapshot` instead.
+
+    :param checks: an ordered mapping of dependency names to functions that return a dict of details about the
+        dependency (with a 'status' of "error" if it is unhealthy) or raise if it can't be reached
+    """
+
+    def __init__(self, app, checks, refresh_interval, clock=time.time):
+        self.app = app
+        self.checks = checks
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._snapshot = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._first_refresh_lock = threading.Lock()
+
+    def snapshot(self):
+        """Return ``(dependencies, checked_at)`` from the latest round of checks."""
+        if self.refresh_interval:
+            self.start()
+            self._first_refresh()
+        else:
+            self.refresh()
+        return self._snapshot
+
+    def refresh(self):
+        dependencies = OrderedDict()
+        for name, check in self.checks.items():
+            started = self._clock()
+            try:
+                details = dict(check() or {})
+                details.setdefault('status', 'ok')
+            except Exception as e:
+                details = {'status': 'error', 'message': str(e)}
+            details['latency_ms'] = int((self._clock() - started) * 1000)
+            dependencies[name] = details
+        self._snapshot = (dependencies, self._clock())
+
+    def _first_refresh(self):
+        # whichever of the background thread and a request gets here first runs the checks, the other waits for them
+        with self._first_refresh_lock:
+            if self._snapshot is None:
+                self.refresh()
+
+    def start(self):
+        """Start checking in the background, unless that's already happening in this process."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='status-monitor')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        first = True
+        while True:
+            try:
+                with self.app.app_context():
+                    if first:
+                        self._first_refresh()
+                    else:
+                        self.refresh()
+            except Exception:
+                self.app.logger.exception('Checking dependency status failed')
+            first = False
+            time.sleep(self.refresh_interval)
+
+
+def init_app(application):
+    """Starts the background checks when the app serves its first request, in each process that serves requests.
+
+    Commands run with the app (such as the supplier_invites ones) don't serve requests, so they don't check anything.
+    """
+    if application.config['DM_STATUS_REFRESH_INTERVAL']:
+        @application.before_first_request
+        def start_status_monitor():
+            get_monitor().start()
+
+
+def get_monitor():
+    monitor = current_app.extensions.get('status_monitor')
+    if monitor is None:
+        monitor = current_app.extensions['status_monitor'] = StatusMonitor(
+            current_app._get_current_object(),
+            default_checks(current_app.config),
+            current_app.config['DM_STATUS_REFRESH_INTERVAL'],
+        )
+    return monitor
+
+
+def default_checks(config):
+    """The checks for the dependencies listed in DM_STATUS_CHECKS that this app is configured to use."""
+    enabled = config['DM_STATUS_CHECKS']
+    checks = OrderedDict()
+    if 'data_api' in enabled:
+        checks['data_api'] = check_data_api
+    if 'redis' in enabled and current_app.extensions.get('redis') is not None:
+        checks['redis'] = check_redis
+    if 'render_service' in enabled and config['REACT_RENDER']:
+        checks['render_service'] = check_render_service
+    if 's3' in enabled:
+        for bucket_setting in config['DM_STATUS_CHECK_BUCKETS']:
+            if config.get(bucket_setting):
+                checks['s3:{}'.format(config[bucket_setting])] = _bucket_check(config[bucket_setting])
+    return checks
+
+
+def check_data_api():
+    return data_api_client.get_status()
+
+
+def check_redis():
+    current_app.extensions['redis'].ping()
+
+
+def check_render_service():
+    response = requests.head(
+        current_app.config['REACT_RENDER_URL'],
+        timeout=(current_app.config['REACT_RENDER_CONNECT_TIMEOUT'], current_app.config['REACT_RENDER_READ_TIMEOUT'])
+    )
+    stats = render_stats()
+    return {
+        'status': 'error' if response.status_code >= 500 or stats['breaker']['state'] == 'open' else 'ok',
+        'breaker': stats['breaker']['state'],
+    }
+
+
+def _bucket_check(bucket_name):
+    def check_bucket():
+        # looking up a key is a cheap request that only succeeds if the bucket is there and we can reach it; the
+        # bucket's connection is the pooled one the app uses, rather than a new one every refresh
+        get_bucket(bucket_name).path_exists('_status')
+
+    return check_bucket
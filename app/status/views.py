@@ -1,7 +1,10 @@
+import time
+
 from flask import jsonify, current_app, request
 
 from . import status
-from .. import data_api_client
+from .monitor import get_monitor
+from ..render import render_stats
 from dmutils.status import get_flags
 
 
@@ -13,21 +16,37 @@ def status():
             status="ok",
         ), 200
 
-    api_status = data_api_client.get_status()
+    dependencies, checked_at = get_monitor().snapshot()
     version = current_app.config['VERSION']
 
-    if api_status['status'] == "ok":
+    # not there if the API isn't one of the DM_STATUS_CHECKS
+    api_status = dependencies.get('data_api')
+    staleness = int(time.time() - checked_at)
+
+    details = dict(
+        version=version,
+        api_status=api_status,
+        dependencies=dependencies,
+        checked_seconds_ago=staleness,
+        render_service=render_stats(),
+        flags=get_flags(current_app)
+    )
+
+    if staleness > current_app.config['DM_STATUS_MAX_STALENESS']:
+        return jsonify(
+            status="error",
+            message="Dependency status has not been checked for {} seconds.".format(staleness),
+            **details
+        ), 500
+
+    if api_status is None or api_status['status'] == "ok":
         return jsonify(
             status="ok",
-            version=version,
-            api_status=api_status,
-            flags=get_flags(current_app)
+            **details
         )
 
     return jsonify(
         status="error",
-        version=version,
-        api_status=api_status,
         message="Error connecting to the (Data) API.",
-        flags=get_flags(current_app)
+        **details
     ), 500
@@ -5,7 +5,10 @@ import sys
 
 from app import create_app
 from dmutils import init_manager
+import app.emails
 import app.invites
+from app.main import CONTENT_PATH, CONTENT_MANIFESTS, CONTENT_MESSAGES
+from app.main.helpers.content import LazyContentLoader, build_snapshot
 
 
 port = int(os.getenv('PORT', '5003'))
@@ -17,8 +20,17 @@ application.jinja_options = {
 }
 
 manager = init_manager(application, port, ['./app/content/frameworks'])
+app.emails.init_manager(manager)
 app.invites.init_manager(manager)
 
+
+@manager.option('-o', '--output', dest='snapshot_path', default=os.getenv('DM_CONTENT_SNAPSHOT', 'content.snapshot'))
+def build_content_snapshot(snapshot_path):
+    """Parse the framework content and save it where DM_CONTENT_SNAPSHOT can point to."""
+    build_snapshot(LazyContentLoader(CONTENT_PATH), CONTENT_PATH, CONTENT_MANIFESTS, CONTENT_MESSAGES, snapshot_path)
+    application.logger.info('Content snapshot written to {}'.format(snapshot_path))
+
+
 application.logger.info('Command line: {}'.format(sys.argv))
 
 if __name__ == '__main__':
@@ -24,6 +24,15 @@ class Config(object):
 
     DM_DATA_API_URL = None
     DM_DATA_API_AUTH_TOKEN = None
+    # deduplicate identical Data API reads made while handling a single request
+    DM_API_REQUEST_CACHE = True
+    # fail fast rather than have every worker thread wait on a struggling API: at most DM_API_MAX_CONCURRENT_CALLS
+    # calls in flight per process, and no calls for DM_API_BREAKER_RESET_TIMEOUT seconds after
+    # DM_API_BREAKER_THRESHOLD server errors in a row
+    DM_API_MAX_CONCURRENT_CALLS = 20
+    DM_API_BULKHEAD_TIMEOUT = 2
+    DM_API_BREAKER_THRESHOLD = 10
+    DM_API_BREAKER_RESET_TIMEOUT = 15
     DM_CLARIFICATION_QUESTION_EMAIL = 'no-reply@marketplace.dta.gov.au'
     DM_FRAMEWORK_AGREEMENTS_EMAIL = 'enquiries@example.com'
 
@@ -33,6 +42,36 @@ class Config(object):
     DM_SUBMISSIONS_BUCKET = None
     DM_ASSETS_URL = None
 
+    # process-wide cache for rarely changing API data, e.g. framework documents
+    CACHE_TYPE = 'simple'
+    CACHE_THRESHOLD = 1000
+    DM_FRAMEWORK_CACHE_TIMEOUT = 5 * 60
+    DM_COMMUNICATIONS_CACHE_TIMEOUT = 60
+    # framework ids by slug; ids don't change, this only bounds how long a framework deleted from the API is remembered
+    DM_FRAMEWORK_REGISTRY_TIMEOUT = 24 * 60 * 60
+    # agreements are countersigned rarely and never un-countersigned, so remember a 'yes' for much longer than a 'no'
+    DM_COUNTERSIGNED_AGREEMENT_CACHE_TIMEOUT = 24 * 60 * 60
+    DM_COUNTERSIGNED_AGREEMENT_NEGATIVE_CACHE_TIMEOUT = 10 * 60
+    # whether a supplier can respond to a brief, reused across the response pages for a few minutes
+    DM_BRIEF_ELIGIBILITY_CACHE_TIMEOUT = 5 * 60
+    # the sellers a brief was opened to, per version of the brief
+    DM_BRIEF_AUDIENCE_CACHE_TIMEOUT = 60 * 60
+
+    # framework content is parsed on first use, except for these frameworks which are loaded when the app starts
+    DM_CONTENT_WARMUP_FRAMEWORKS = ['digital-marketplace', 'digital-outcomes-and-specialists']
+
+    # worker threads, shared by every request in a process, that views run independent API/S3 calls on in parallel;
+    # 1 runs the calls in turn instead
+    DM_CONCURRENT_FETCH_MAX_WORKERS = 16
+
+    # /_status serves dependency health checked in the background every DM_STATUS_REFRESH_INTERVAL seconds (0 checks
+    # on every request), and reports an error if the checks haven't run for DM_STATUS_MAX_STALENESS seconds
+    DM_STATUS_REFRESH_INTERVAL = 15
+    DM_STATUS_MAX_STALENESS = 60
+    DM_STATUS_CHECKS = ['data_api', 'redis', 'render_service', 's3']
+    DM_STATUS_CHECK_BUCKETS = ['DM_AGREEMENTS_BUCKET', 'DM_COMMUNICATIONS_BUCKET', 'DM_DOCUMENTS_BUCKET',
+                               'DM_SUBMISSIONS_BUCKET']
+
     DM_HTTP_PROTO = 'http'
     DM_SEND_EMAIL_TO_STDERR = False
     DM_CACHE_TYPE = 'dev'
@@ -87,16 +126,31 @@ class Config(object):
     REACT_BUNDLE_URL = 'https://dm-dev-frontend.apps.y.cld.gov.au/bundle/'
     REACT_RENDER_URL = 'https://dm-dev-frontend.apps.y.cld.gov.au/render'
     REACT_RENDER = not DEBUG
+    # identical renders are reused for a while rather than going back to the render service; set
+    # REACT_BUNDLE_VERSION when deploying new bundles to stop serving markup rendered by the old ones
+    REACT_BUNDLE_VERSION = os.getenv('REACT_BUNDLE_VERSION')
+    REACT_RENDER_CACHE_SIZE = 512
+    REACT_RENDER_CACHE_TIMEOUT = 5 * 60
+    # keep-alive connections to the render service shared by each process's worker threads; 0 turns pooling off
+    # (the timeouts below still apply)
+    REACT_RENDER_POOL_SIZE = 10
+    # the latency budget for server-side rendering: renders that can't connect or respond within these times are
+    # left to the browser, and after REACT_RENDER_BREAKER_THRESHOLD failures in a row the render service isn't
+    # called at all for REACT_RENDER_BREAKER_RESET_TIMEOUT seconds
+    REACT_RENDER_CONNECT_TIMEOUT = 0.5
+    REACT_RENDER_READ_TIMEOUT = 1.5
+    REACT_RENDER_BREAKER_THRESHOLD = 5
+    REACT_RENDER_BREAKER_RESET_TIMEOUT = 30
 
     ALLOWED_EXTENSIONS = ['pdf', 'jpg', 'jpeg', 'png']
     S3_BUCKET_NAME = ''
     S3_ENDPOINT_URL = 's3-ap-southeast-2.amazonaws.com'
     AWS_DEFAULT_REGION = ''
 
-    GENERIC_EMAIL_DOMAINS = ['bigpond.com', 'digital.gov.au', 'gmail.com', 'hotmail.com', 'icloud.com',
-                             'iinet.net.au', 'internode.on.net', 'live.com.au', 'me.com', 'msn.com',
-                             'optusnet.com.au', 'outlook.com', 'outlook.com.au', 'ozemail.com.au',
-                             'yahoo.com', 'yahoo.com.au']
+    GENERIC_EMAIL_DOMAINS = frozenset(['bigpond.com', 'digital.gov.au', 'gmail.com', 'hotmail.com', 'icloud.com',
+                                       'iinet.net.au', 'internode.on.net', 'live.com.au', 'me.com', 'msn.com',
+                                       'optusnet.com.au', 'outlook.com', 'outlook.com.au', 'ozemail.com.au',
+                                       'yahoo.com', 'yahoo.com.au'])
 
     ROLLBAR_TOKEN = None
     DM_TEAM_SLACK_WEBHOOK = None
@@ -117,6 +171,23 @@ class Config(object):
     REDIS_SSL = False
     REDIS_SSL_HOST_REQ = None
     REDIS_SSL_CA_CERTS = None
+    # connections are pooled per process and kept alive, as reconnecting over TLS is slow; idle connections are
+    # checked before reuse if they haven't been used for REDIS_HEALTH_CHECK_INTERVAL seconds
+    REDIS_MAX_CONNECTIONS = 50
+    REDIS_SOCKET_KEEPALIVE = True
+    REDIS_SOCKET_TIMEOUT = 10
+    REDIS_SOCKET_CONNECT_TIMEOUT = 2
+    REDIS_HEALTH_CHECK_INTERVAL = 30
+
+    # queue outgoing email on Redis for `python application.py email_outbox drain` instead of sending it in-request
+    DM_EMAIL_OUTBOX = False
+    DM_EMAIL_OUTBOX_KEY = 'email-outbox'
+    DM_EMAIL_OUTBOX_MAX_TRIES = 5
+    # a worker that hasn't been heard from for this many seconds is taken to have died, and its emails are requeued;
+    # it must be longer than retrying one email can take
+    DM_EMAIL_OUTBOX_WORKER_TIMEOUT = 5 * 60
+    # most recipients send_bulk_email puts on a single provider call
+    DM_EMAIL_BATCH_SIZE = 50
 
 
 class Test(Config):
@@ -134,6 +205,13 @@ class Test(Config):
 
     DM_DATA_API_AUTH_TOKEN = 'myToken'
 
+    # tests stub the API per test case, so nothing may be cached between requests
+    CACHE_TYPE = 'null'
+    CACHE_NO_NULL_WARNING = True
+    REACT_RENDER_CACHE_SIZE = 0
+    DM_STATUS_REFRESH_INTERVAL = 0
+    DM_STATUS_CHECKS = ['data_api', 'redis']
+
     SECRET_KEY = 'TestKeyTestKeyTestKeyTestKeyTestKeyTestKeyX='
     SHARED_EMAIL_KEY = SECRET_KEY
 
@@ -3,7 +3,7 @@ import re
 from datetime import datetime, timedelta
 from urllib2 import quote
 
-from app import create_app
+from app import cache, create_app
 from tests import login_for_tests
 from app import data_api_client
 from dmutils.formats import DATETIME_FORMAT
@@ -114,8 +114,13 @@ def empty_g7_draft():
 
 
 class BaseApplicationTest(object):
+    # the test config turns caching off; set this to a Flask-Caching backend (eg 'simple') to test code that caches
+    cache_type = None
+
     def setup(self):
         self.app = create_app('test')
+        if self.cache_type is not None:
+            cache.init_app(self.app, config={'CACHE_TYPE': self.cache_type})
         self.app.register_blueprint(login_for_tests)
         self.client = self.app.test_client()
         self.get_user_patch = None
@@ -1,7 +1,12 @@
 from StringIO import StringIO
+import gzip
+import os
+import shutil
+import tempfile
 import textwrap
 
 import mock
+import pytest
 
 from app import invites
 
@@ -47,6 +52,92 @@ class TestSupplierInvites(BaseApplicationTest):
                 mock.call(supplier_code=456, email_address='someone.else@example.com'),
             ])
 
+    @mock.patch('app.invites.data_api_client')
+    @mock.patch('app.invites.send_email')
+    def test_send_supplier_invites_concurrently(self, send_email, data_api_client):
+        data = ''.join('Someone,someone{0}@example.com,{0},Supplier {0}\n'.format(i) for i in range(20))
+        with self.app.app_context():
+            invites.send(StringIO(data), workers='4')
+
+        assert send_email.call_count == 20
+        assert sorted(call[1]['supplier_code'] for call in data_api_client.record_supplier_invite.call_args_list) == \
+            list(range(20))
+
+    @mock.patch('app.invites.data_api_client')
+    @mock.patch('app.invites.send_email')
+    def test_send_supplier_invites_skips_rows_in_checkpoint(self, send_email, data_api_client):
+        data = textwrap.dedent("""\
+            Me,me@example.com,123,Example Supplier
+            Someone Else,someone.else@example.com,456,Another Example Supplier
+        """)
+        tmp_dir = tempfile.mkdtemp()
+        checkpoint = os.path.join(tmp_dir, 'invites.done')
+        try:
+            with open(checkpoint, 'w') as f:
+                f.write('Me,me@example.com,123,Example Supplier\r\n')
+
+            with self.app.app_context():
+                invites.send(StringIO(data), checkpoint=checkpoint)
+
+            send_email.assert_called_once_with('someone.else@example.com', mock.ANY, mock.ANY, mock.ANY, mock.ANY)
+            with open(checkpoint) as f:
+                assert f.read().splitlines() == [
+                    'Me,me@example.com,123,Example Supplier',
+                    'Someone Else,someone.else@example.com,456,Another Example Supplier',
+                ]
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    @mock.patch('app.invites.data_api_client')
+    @mock.patch('app.invites.send_email')
+    def test_failed_invites_are_not_checkpointed(self, send_email, data_api_client):
+        send_email.side_effect = invites.EmailError('failed')
+        tmp_dir = tempfile.mkdtemp()
+        checkpoint = os.path.join(tmp_dir, 'invites.done')
+        try:
+            with self.app.app_context():
+                invites.send(StringIO('Me,me@example.com,123,Example Supplier\n'), checkpoint=checkpoint)
+
+            with open(checkpoint) as f:
+                assert f.read() == ''
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    @mock.patch('app.invites.data_api_client')
+    @mock.patch('app.invites.send_email')
+    def test_invites_that_were_sent_but_not_recorded_are_checkpointed(self, send_email, data_api_client):
+        data_api_client.record_supplier_invite.side_effect = invites.HTTPError(mock.Mock(status_code=503))
+        tmp_dir = tempfile.mkdtemp()
+        checkpoint = os.path.join(tmp_dir, 'invites.done')
+        try:
+            with self.app.app_context():
+                invites.send(StringIO('Me,me@example.com,123,Example Supplier\n'), checkpoint=checkpoint)
+
+            with open(checkpoint) as f:
+                assert f.read().splitlines() == ['Me,me@example.com,123,Example Supplier']
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    @mock.patch('app.invites.data_api_client')
+    @mock.patch('app.invites.send_email')
+    def test_unexpected_errors_stop_concurrent_invites(self, send_email, data_api_client):
+        send_email.side_effect = ValueError('unexpected')
+        data = ''.join('Someone,someone{0}@example.com,{0},Supplier {0}\n'.format(i) for i in range(20))
+        with self.app.app_context():
+            with pytest.raises(ValueError):
+                invites.send(StringIO(data), workers='2')
+
+        assert send_email.call_count < 20
+
+    @mock.patch('app.invites.time')
+    def test_rate_limiter_spaces_out_calls(self, time):
+        time.time.return_value = 100.0
+        rate_limiter = invites.RateLimiter(rate=4)
+        for _ in range(3):
+            rate_limiter.wait()
+
+        assert time.sleep.call_args_list == [mock.call(0.0), mock.call(0.25), mock.call(0.5)]
+
     @mock.patch('app.invites.data_api_client')
     @mock.patch('app.invites.send_email')
     def test_list_candidates(self, send_email, data_api_client):
@@ -90,3 +181,48 @@ class TestSupplierInvites(BaseApplicationTest):
 
             # Should be able to handle this data without errors
             invites.send(pipe)
+
+    @mock.patch('app.invites.data_api_client')
+    def test_list_candidates_follows_next_page_links(self, data_api_client):
+        first_page, second_page = self.contact_data
+        data_api_client.list_supplier_account_invite_candidates.return_value = {
+            'results': [first_page], 'links': {'next': 'http://api/suppliers/invite-candidates?page=2'}
+        }
+        data_api_client._get.return_value = {'results': [second_page], 'links': {}}
+
+        pipe = StringIO()
+        with self.app.app_context():
+            invites.list_candidates(pipe)
+
+        data_api_client._get.assert_called_once_with('http://api/suppliers/invite-candidates?page=2')
+        assert pipe.getvalue().splitlines() == [
+            'Kris Kringle,info@alpha.com.au,11,Mu Digital Consulting Group',
+            'Kris Kringle,info@alpha.com.au,6,Eta Digital Consulting Group',
+        ]
+
+    @mock.patch('app.invites.logging')
+    @mock.patch('app.invites.data_api_client')
+    def test_list_candidates_since(self, data_api_client, logging):
+        old, new = [dict(candidate) for candidate in self.contact_data]
+        old['createdAt'] = '2017-01-01T00:00:00.000000Z'
+        new['createdAt'] = '2017-06-01T00:00:00.000000Z'
+        no_timestamp = dict(self.contact_data[0], supplierCode=12)
+        data_api_client.list_supplier_account_invite_candidates.return_value = {'results': [old, new, no_timestamp]}
+
+        pipe = StringIO()
+        with self.app.app_context():
+            invites.list_candidates(pipe, since='2017-03-01')
+
+        assert [row.split(',')[2] for row in pipe.getvalue().splitlines()] == ['6']
+        logging.warning.assert_called_once_with('Left out 1 candidates with no creation time')
+
+    @mock.patch('app.invites.data_api_client')
+    def test_list_unclaimed_gzip(self, data_api_client):
+        data_api_client.list_unclaimed_supplier_account_invites.return_value = {'results': self.contact_data}
+
+        pipe = StringIO()
+        with self.app.app_context():
+            invites.list_unclaimed(pipe, gzip=True)
+
+        pipe.seek(0)
+        assert 'Mu Digital Consulting Group' in gzip.GzipFile(fileobj=pipe).read()
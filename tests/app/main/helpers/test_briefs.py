@@ -0,0 +1,210 @@
+import mock
+import pytest
+from werkzeug.exceptions import NotFound
+
+from app.main.helpers.briefs import (
+    BriefAudience, BriefContext, get_brief_audience, get_brief_context, is_supplier_not_eligible_for_brief,
+    is_supplier_selected_for_brief
+)
+
+from ...helpers import BaseApplicationTest
+
+
+@mock.patch('app.main.helpers.briefs.current_user', mock.Mock(application_id=None))
+class TestBriefEligibilityCache(BaseApplicationTest):
+    cache_type = 'simple'
+
+    def setup(self):
+        super(TestBriefEligibilityCache, self).setup()
+        self.data_api_client = mock.Mock()
+        self.data_api_client.get_framework.return_value = {'frameworks': {'id': 7}}
+        self.data_api_client.get_supplier.return_value = {
+            'supplier': {'frameworks': [{'framework_id': 7}], 'domains': {'legacy': []}}
+        }
+        self.brief = {'id': 1, 'updatedAt': '2017-06-01T00:00:00.000000Z', 'dates': {'closing_date': '2017-07-01'}}
+
+    def test_eligibility_is_remembered(self):
+        with self.app.app_context():
+            assert is_supplier_not_eligible_for_brief(self.data_api_client, 1234, self.brief) is None
+            assert is_supplier_not_eligible_for_brief(self.data_api_client, 1234, self.brief) is None
+
+        assert self.data_api_client.get_supplier.call_count == 1
+        assert self.data_api_client.get_framework.call_count == 1
+
+    def test_ineligibility_is_remembered(self):
+        self.data_api_client.get_supplier.return_value['supplier']['frameworks'] = []
+        with self.app.app_context():
+            for _ in range(2):
+                assert is_supplier_not_eligible_for_brief(self.data_api_client, 1234, self.brief) == \
+                    'briefs/cant_apply_to_new_panel_opportunity.html'
+
+        assert self.data_api_client.get_supplier.call_count == 1
+
+    def test_an_updated_brief_is_checked_again(self):
+        with self.app.app_context():
+            is_supplier_not_eligible_for_brief(self.data_api_client, 1234, self.brief)
+            self.brief['updatedAt'] = '2017-06-02T00:00:00.000000Z'
+            is_supplier_not_eligible_for_brief(self.data_api_client, 1234, self.brief)
+
+        assert self.data_api_client.get_supplier.call_count == 2
+
+    def test_framework_id_is_not_fetched_for_every_brief(self):
+        other_brief = dict(self.brief, id=2)
+        with self.app.app_context():
+            is_supplier_not_eligible_for_brief(self.data_api_client, 1234, self.brief)
+            is_supplier_not_eligible_for_brief(self.data_api_client, 1234, other_brief)
+
+        self.data_api_client.get_framework.assert_called_once_with('digital-marketplace')
+
+    def test_decisions_are_per_supplier(self):
+        with self.app.app_context():
+            is_supplier_not_eligible_for_brief(self.data_api_client, 1234, self.brief)
+            is_supplier_not_eligible_for_brief(self.data_api_client, 5678, self.brief)
+
+        assert self.data_api_client.get_supplier.call_args_list == [mock.call(1234), mock.call(5678)]
+
+    def test_eligibility_uses_the_supplier_given(self):
+        supplier = {'frameworks': [{'framework_id': 7}], 'domains': {'legacy': []}}
+        self.data_api_client.get_application.return_value = {'application': {'type': 'new', 'status': 'submitted'}}
+        with self.app.app_context(), \
+                mock.patch('app.main.helpers.briefs.current_user', mock.Mock(application_id=9876)):
+            assert is_supplier_not_eligible_for_brief(self.data_api_client, 1234, self.brief, supplier=supplier) == \
+                'briefs/pending_initial_seller_assessment.html'
+
+        assert not self.data_api_client.get_supplier.called
+        self.data_api_client.get_application.assert_called_once_with(9876)
+
+    def test_pending_assessments_are_prioritised_on_every_check(self):
+        self.data_api_client.get_application.return_value = {'application': {'type': 'new', 'status': 'submitted'}}
+        with self.app.app_context(), \
+                mock.patch('app.main.helpers.briefs.current_user', mock.Mock(application_id=9876)):
+            for _ in range(2):
+                assert is_supplier_not_eligible_for_brief(self.data_api_client, 1234, self.brief) == \
+                    'briefs/pending_initial_seller_assessment.html'
+
+        assert self.data_api_client.get_application.call_count == 1
+        assert self.data_api_client.req.prioritise.call_args_list == [mock.call(9876)] * 2
+        assert self.data_api_client.req.prioritise.return_value.post.call_args_list == [mock.call('2017-07-01')] * 2
+
+    def test_nothing_is_fetched_once_the_decision_is_cached(self):
+        supplier = {'frameworks': [{'framework_id': 7}], 'domains': {'legacy': []}}
+        with self.app.app_context(), \
+                mock.patch('app.main.helpers.briefs.current_user', mock.Mock(application_id=9876)):
+            for _ in range(2):
+                assert is_supplier_not_eligible_for_brief(
+                    self.data_api_client, 1234, self.brief, supplier=supplier) is None
+
+        assert self.data_api_client.get_application.call_count == 1
+        assert self.data_api_client.get_framework.call_count == 1
+
+    def test_supplier_without_an_application(self):
+        with self.app.app_context():
+            assert is_supplier_not_eligible_for_brief(self.data_api_client, 1234, self.brief) is None
+
+        assert not self.data_api_client.get_application.called
+
+    def test_application_that_cannot_be_fetched(self):
+        self.data_api_client.get_application.side_effect = Exception('nope')
+
+        with self.app.app_context(), \
+                mock.patch('app.main.helpers.briefs.current_user', mock.Mock(application_id=9876)):
+            assert is_supplier_not_eligible_for_brief(self.data_api_client, 1234, self.brief) is None
+
+
+class TestBriefContext(BaseApplicationTest):
+    def setup(self):
+        super(TestBriefContext, self).setup()
+        self.data_api_client = mock.Mock()
+        self.data_api_client.get_brief.return_value = {'briefs': {'id': 1, 'status': 'live'}}
+        self.data_api_client.get_supplier.return_value = {'supplier': {'code': 1234}}
+        self.data_api_client.find_brief_responses.return_value = {'briefResponses': [{'id': 5}]}
+
+    def test_get_brief_context(self):
+        with self.app.app_context():
+            context = get_brief_context(self.data_api_client, 1, 1234)
+
+        assert context == BriefContext(
+            brief={'id': 1, 'status': 'live'},
+            supplier={'code': 1234},
+            brief_responses=[{'id': 5}],
+        )
+        assert context.has_responded
+        self.data_api_client.find_brief_responses.assert_called_once_with(brief_id=1, supplier_code=1234)
+
+    def test_eligibility_details_are_not_fetched(self):
+        with self.app.app_context():
+            get_brief_context(self.data_api_client, 1, 1234)
+
+        assert not self.data_api_client.get_application.called
+        assert not self.data_api_client.get_framework.called
+
+    def test_brief_status_is_checked(self):
+        with self.app.app_context(), pytest.raises(NotFound):
+            get_brief_context(self.data_api_client, 1, 1234, allowed_statuses=['closed'])
+
+
+class TestBriefAudience(BaseApplicationTest):
+    cache_type = 'simple'
+
+    def setup(self):
+        super(TestBriefAudience, self).setup()
+        self.brief = {
+            'id': 1,
+            'updatedAt': '2017-06-01T00:00:00.000000Z',
+            'sellerSelector': 'someSellers',
+            'sellerEmailList': ['Jane@Example.com', 'someone@gmail.com'],
+            'sellers': {'1234': {}, 5678: {}},
+        }
+
+    def test_from_brief(self):
+        assert BriefAudience.from_brief(self.brief) == BriefAudience(
+            email_addresses=frozenset(['jane@example.com', 'someone@gmail.com']),
+            email_domains=frozenset(['example.com', 'gmail.com']),
+            seller_codes=frozenset(['1234', '5678']),
+        )
+
+    def test_one_seller_audience_is_the_seller_email(self):
+        self.brief.update(sellerSelector='oneSeller', sellerEmail='Bob@Example.org')
+
+        assert BriefAudience.from_brief(self.brief).email_addresses == frozenset(['bob@example.org'])
+
+    def test_includes_email(self):
+        audience = BriefAudience.from_brief(self.brief)
+
+        with self.app.app_context():
+            assert audience.includes_email('JANE@example.com')
+            assert audience.includes_email('colleague@example.com')
+            assert audience.includes_email('someone@gmail.com')
+            assert not audience.includes_email('anyone@gmail.com')
+            assert not audience.includes_email('jane@example.org')
+
+    def test_includes_seller(self):
+        audience = BriefAudience.from_brief(self.brief)
+
+        assert audience.includes_seller(1234)
+        assert audience.includes_seller('5678')
+        assert not audience.includes_seller(9999)
+
+    def test_audience_is_cached_per_brief_version(self):
+        with self.app.app_context():
+            audience = get_brief_audience(self.brief)
+            self.brief['sellerEmailList'] = []
+            assert get_brief_audience(self.brief) == audience
+
+            self.brief['updatedAt'] = '2017-06-02T00:00:00.000000Z'
+            assert get_brief_audience(self.brief).email_addresses == frozenset()
+
+    def test_supplier_selected_by_email_domain(self):
+        user = mock.Mock(email_address='colleague@example.com')
+
+        with self.app.app_context():
+            assert is_supplier_selected_for_brief(mock.Mock(), user, self.brief)
+
+    def test_supplier_selected_by_seller_code(self):
+        self.brief['lot'] = 'rfx'
+        user = mock.Mock(role='supplier', supplier_code=5678)
+
+        with self.app.app_context():
+            assert is_supplier_selected_for_brief(mock.Mock(), user, self.brief)
+            user.supplier_code = 9999
+            assert not is_supplier_selected_for_brief(mock.Mock(), user, self.brief)
@@ -0,0 +1,49 @@
+import os
+import threading
+
+import mock
+
+from app.main.helpers.buckets import get_bucket
+
+from ...helpers import BaseApplicationTest
+
+
+@mock.patch('dmutils.s3.S3')
+class TestGetBucket(BaseApplicationTest):
+    def test_bucket_is_reused_across_calls(self, s3):
+        with self.app.app_context():
+            assert get_bucket('bucket-1') is get_bucket('bucket-1')
+
+        s3.assert_called_once_with('bucket-1')
+
+    def test_each_bucket_name_gets_its_own_client(self, s3):
+        with self.app.app_context():
+            get_bucket('bucket-1')
+            get_bucket('bucket-2')
+
+        assert s3.call_args_list == [mock.call('bucket-1'), mock.call('bucket-2')]
+
+    def test_buckets_are_shared_between_threads(self, s3):
+        s3.side_effect = lambda name: mock.Mock()
+
+        def get_bucket_in_thread():
+            with self.app.app_context():
+                buckets.append(get_bucket('bucket-1'))
+
+        buckets = []
+        threads = [threading.Thread(target=get_bucket_in_thread) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert buckets[0] is buckets[1]
+        s3.assert_called_once_with('bucket-1')
+
+    def test_buckets_are_not_shared_with_forked_processes(self, s3):
+        s3.side_effect = lambda name: mock.Mock()
+
+        with self.app.app_context():
+            bucket = get_bucket('bucket-1')
+            with mock.patch('os.getpid', return_value=os.getpid() + 1):
+                assert get_bucket('bucket-1') is not bucket
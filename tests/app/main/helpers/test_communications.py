@@ -0,0 +1,62 @@
+import mock
+
+from app.main.helpers.communications import CommunicationsIndex, get_communications_index
+
+from ...helpers import BaseApplicationTest
+
+
+def _file(path, last_modified):
+    return {'path': path, 'last_modified': last_modified}
+
+
+class TestCommunicationsIndex(object):
+    def setup(self):
+        self.index = CommunicationsIndex('g-cloud-7', [
+            _file('g-cloud-7/communications/g-cloud-7-supplier-pack.zip', '2015-01-01T14:00:00.000Z'),
+            _file('g-cloud-7/communications/updates/communications/file 1.odt', '2015-02-01T14:00:00.000Z'),
+            _file('g-cloud-7/communications/updates/clarifications/file 2.odt', '2015-03-01T14:00:00.000Z'),
+            _file('g-cloud-7-other/communications/updates/communications/file 3.odt', '2015-04-01T14:00:00.000Z'),
+        ])
+
+    def test_files_from_other_frameworks_are_ignored(self):
+        assert len(self.index.files) == 3
+
+    def test_last_modified_for_a_directory_uses_the_last_listed_file(self):
+        assert self.index.last_modified('communications/updates/') == '2015-03-01T14:00:00.000Z'
+
+    def test_last_modified_for_a_full_path(self):
+        assert self.index.last_modified(
+            'communications/g-cloud-7-supplier-pack.zip') == '2015-01-01T14:00:00.000Z'
+
+    def test_last_modified_for_a_partial_file_name(self):
+        assert self.index.last_modified('communications/g-cloud-7-supplier') == '2015-01-01T14:00:00.000Z'
+
+    def test_last_modified_is_none_if_nothing_matches(self):
+        assert self.index.last_modified('communications/nothing/') is None
+        assert self.index.last_modified('communications/nothing.zip') is None
+
+    def test_updates_are_grouped_with_paths_relative_to_communications(self):
+        assert self.index.updates == {
+            'communications': [
+                _file('updates/communications/file 1.odt', '2015-02-01T14:00:00.000Z'),
+            ],
+            'clarifications': [
+                _file('updates/clarifications/file 2.odt', '2015-03-01T14:00:00.000Z'),
+            ],
+        }
+
+
+@mock.patch('dmutils.s3.S3')
+class TestGetCommunicationsIndex(BaseApplicationTest):
+    cache_type = 'simple'
+
+    def test_listing_is_cached(self, s3):
+        s3.return_value.list.return_value = [
+            _file('g-cloud-7/communications/updates/communications/file 1.odt', '2015-02-01T14:00:00.000Z'),
+        ]
+        with self.app.app_context():
+            get_communications_index('g-cloud-7')
+            index = get_communications_index('g-cloud-7')
+
+        s3.return_value.list.assert_called_once_with('g-cloud-7', load_timestamps=True)
+        assert index.last_modified('communications/updates/') == '2015-02-01T14:00:00.000Z'
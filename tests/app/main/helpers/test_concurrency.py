@@ -0,0 +1,71 @@
+import threading
+from functools import partial
+
+import pytest
+from flask import abort, g, request
+from werkzeug.exceptions import NotFound
+
+from app.main.helpers.concurrency import fetch_concurrently
+
+from ...helpers import BaseApplicationTest
+
+
+class TestFetchConcurrently(BaseApplicationTest):
+    def test_returns_results_keyed_by_name(self):
+        with self.app.test_request_context('/'):
+            results = fetch_concurrently(('one', lambda: 1), ('two', partial(sum, [1, 1])))
+
+        assert results == {'one': 1, 'two': 2}
+
+    def test_calls_run_in_worker_threads(self):
+        with self.app.test_request_context('/'):
+            results = fetch_concurrently(('one', threading.current_thread), ('two', threading.current_thread))
+
+        assert threading.current_thread() not in results.values()
+
+    def test_calls_share_the_request_context(self):
+        with self.app.test_request_context('/some/path'):
+            g.marker = 'set by caller'
+            results = fetch_concurrently(('path', lambda: request.path), ('marker', lambda: g.marker))
+
+        assert results == {'path': '/some/path', 'marker': 'set by caller'}
+
+    def test_exceptions_are_reraised_in_the_caller(self):
+        with self.app.test_request_context('/'):
+            with pytest.raises(NotFound):
+                fetch_concurrently(('ok', lambda: 1), ('missing', partial(abort, 404)))
+
+    def test_the_first_failure_in_the_order_given_is_reraised(self):
+        def fail_slowly():
+            threading.Event().wait(0.05)
+            abort(404)
+
+        with self.app.test_request_context('/'):
+            for _ in range(5):
+                with pytest.raises(NotFound):
+                    fetch_concurrently(('missing', fail_slowly), ('broken', partial(abort, 503)))
+
+    def test_calls_share_one_pool_of_threads(self):
+        with self.app.test_request_context('/'):
+            fetch_concurrently(('one', threading.current_thread), ('two', threading.current_thread))
+            executor = self.app.extensions['concurrent_fetch_executor']
+            results = fetch_concurrently(('one', threading.current_thread), ('two', threading.current_thread))
+
+        assert self.app.extensions['concurrent_fetch_executor'] is executor
+        assert set(results.values()) <= executor._threads
+
+    def test_nested_calls_run_in_turn(self):
+        def nested():
+            return fetch_concurrently(('inner', threading.current_thread), ('other', threading.current_thread))
+
+        with self.app.test_request_context('/'):
+            results = fetch_concurrently(('outer', nested), ('other', lambda: None))
+
+        assert len(set(results['outer'].values())) == 1
+
+    def test_runs_sequentially_with_a_single_worker(self):
+        self.app.config['DM_CONCURRENT_FETCH_MAX_WORKERS'] = 1
+        with self.app.test_request_context('/'):
+            results = fetch_concurrently(('one', threading.current_thread), ('two', threading.current_thread))
+
+        assert set(results.values()) == {threading.current_thread()}
@@ -0,0 +1,229 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import mock
+from dmcontent.content_loader import ContentLoader
+
+from app.main.helpers.content import LazyContentLoader, build_snapshot, load_content
+
+MANIFESTS = [('g-cloud-7', 'declaration', 'declaration')]
+MESSAGES = [('g-cloud-7', ['dates'])]
+
+
+class FakeContentLoader(object):
+    # counted on the class, as the instance state is what gets snapshotted
+    loads = 0
+
+    def __init__(self):
+        self._content = {}
+        self._messages = {}
+
+    def load_manifest(self, framework_slug, question_set, manifest):
+        FakeContentLoader.loads += 1
+        self._content.setdefault(framework_slug, {})[manifest] = [{'name': question_set}]
+
+    def load_messages(self, framework_slug, blocks):
+        FakeContentLoader.loads += 1
+        self._messages.setdefault(framework_slug, {}).update((block, {}) for block in blocks)
+
+
+class TestContentSnapshot(object):
+    def setup(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.content_path = os.path.join(self.tmp_dir, 'content')
+        os.makedirs(os.path.join(self.content_path, 'frameworks'))
+        self._write_content('declaration: true')
+        self.snapshot_path = os.path.join(self.tmp_dir, 'content.snapshot')
+        FakeContentLoader.loads = 0
+
+    def teardown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write_content(self, text):
+        with open(os.path.join(self.content_path, 'frameworks', 'declaration.yml'), 'w') as f:
+            f.write(text)
+
+    def _load(self, snapshot_path):
+        return load_content(FakeContentLoader(), self.content_path, MANIFESTS, MESSAGES, snapshot_path)
+
+    def test_content_is_loaded_from_yaml_without_a_snapshot(self):
+        content_loader = self._load(None)
+
+        assert FakeContentLoader.loads == 2
+        assert content_loader._content == {'g-cloud-7': {'declaration': [{'name': 'declaration'}]}}
+
+    def test_content_is_loaded_from_yaml_if_the_snapshot_is_missing(self):
+        self._load(self.snapshot_path)
+
+        assert FakeContentLoader.loads == 2
+
+    def test_content_is_restored_from_a_current_snapshot(self):
+        build_snapshot(FakeContentLoader(), self.content_path, MANIFESTS, MESSAGES, self.snapshot_path)
+        FakeContentLoader.loads = 0
+        content_loader = self._load(self.snapshot_path)
+
+        assert FakeContentLoader.loads == 0
+        assert content_loader._content == {'g-cloud-7': {'declaration': [{'name': 'declaration'}]}}
+        assert content_loader._messages == {'g-cloud-7': {'dates': {}}}
+
+    def test_snapshot_is_ignored_once_the_content_changes(self):
+        build_snapshot(FakeContentLoader(), self.content_path, MANIFESTS, MESSAGES, self.snapshot_path)
+        self._write_content('declaration: false')
+        FakeContentLoader.loads = 0
+        self._load(self.snapshot_path)
+
+        assert FakeContentLoader.loads == 2
+
+    def test_snapshot_is_ignored_if_the_manifests_change(self):
+        build_snapshot(FakeContentLoader(), self.content_path, [], MESSAGES, self.snapshot_path)
+        FakeContentLoader.loads = 0
+        self._load(self.snapshot_path)
+
+        assert FakeContentLoader.loads == 2
+
+    def test_content_is_not_read_while_the_files_are_unchanged(self):
+        build_snapshot(FakeContentLoader(), self.content_path, MANIFESTS, MESSAGES, self.snapshot_path)
+        with mock.patch('app.main.helpers.content.content_hash') as content_hash:
+            self._load(self.snapshot_path)
+
+        assert not content_hash.called
+
+    def test_snapshot_is_used_if_only_the_modification_times_change(self):
+        build_snapshot(FakeContentLoader(), self.content_path, MANIFESTS, MESSAGES, self.snapshot_path)
+        path = os.path.join(self.content_path, 'frameworks', 'declaration.yml')
+        os.utime(path, (0, 0))
+        FakeContentLoader.loads = 0
+        self._load(self.snapshot_path)
+
+        assert FakeContentLoader.loads == 0
+
+    def test_corrupt_snapshot_is_ignored(self):
+        with open(self.snapshot_path, 'wb') as f:
+            f.write('not a pickle')
+        self._load(self.snapshot_path)
+
+        assert FakeContentLoader.loads == 2
+
+
+class TestSnapshotOfFrameworkContent(object):
+    """Round trips real content through a snapshot, as restoring one sets dmcontent's internal state directly."""
+
+    manifests = [
+        ('digital-marketplace', 'brief-responses', 'edit_brief_response'),
+        ('g-cloud-7', 'declaration', 'declaration'),
+    ]
+    messages = [('g-cloud-7', ['dates'])]
+
+    def setup(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.snapshot_path = os.path.join(self.tmp_dir, 'content.snapshot')
+
+    def teardown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_restored_content_works_like_content_loaded_from_yaml(self):
+        build_snapshot(
+            LazyContentLoader('app/content'), 'app/content', self.manifests, self.messages, self.snapshot_path)
+        with mock.patch.object(ContentLoader, 'load_manifest') as load_manifest, \
+                mock.patch.object(ContentLoader, 'load_messages') as load_messages:
+            restored = load_content(
+                LazyContentLoader('app/content'), 'app/content', self.manifests, self.messages, self.snapshot_path)
+            restored.warm()
+        loaded = load_content(LazyContentLoader('app/content'), 'app/content', self.manifests, self.messages)
+
+        assert not load_manifest.called
+        assert not load_messages.called
+
+        def section_ids(content_loader):
+            content = content_loader.get_manifest('digital-marketplace', 'edit_brief_response')
+            return [section.id for section in content.filter({'lot': 'digital-specialists'}).sections]
+
+        assert section_ids(restored) == section_ids(loaded)
+        assert section_ids(restored)
+        assert restored.get_manifest('g-cloud-7', 'declaration').get_next_editable_section_id() == \
+            loaded.get_manifest('g-cloud-7', 'declaration').get_next_editable_section_id()
+        assert restored.get_message('g-cloud-7', 'dates').framework_close_date == '3pm BST, 6 October 2015'
+
+
+@mock.patch.object(ContentLoader, 'load_messages')
+@mock.patch.object(ContentLoader, 'load_manifest')
+class TestLazyContentLoader(object):
+    def setup(self):
+        self.content_loader = LazyContentLoader('app/content')
+        self.content_loader.load_manifest('g-cloud-7', 'declaration', 'declaration')
+        self.content_loader.load_manifest('g-cloud-8', 'services', 'edit_service')
+        self.content_loader.load_messages('g-cloud-7', ['dates'])
+
+    def test_registering_does_not_load_anything(self, load_manifest, load_messages):
+        assert not load_manifest.called
+        assert not load_messages.called
+
+    @mock.patch.object(ContentLoader, 'get_manifest')
+    def test_manifest_is_loaded_once_on_first_use(self, get_manifest, load_manifest, load_messages):
+        self.content_loader.get_manifest('g-cloud-7', 'declaration')
+        self.content_loader.get_builder('g-cloud-7', 'declaration')
+
+        load_manifest.assert_called_once_with('g-cloud-7', 'declaration', 'declaration')
+        assert get_manifest.call_args_list == [mock.call('g-cloud-7', 'declaration')] * 2
+
+    @mock.patch.object(ContentLoader, 'get_message')
+    def test_messages_are_loaded_on_first_use(self, get_message, load_manifest, load_messages):
+        self.content_loader.get_message('g-cloud-7', 'dates', 'framework_close_date')
+        self.content_loader.get_message('g-cloud-7', 'dates', 'framework_close_date')
+
+        load_messages.assert_called_once_with('g-cloud-7', ['dates'])
+
+    def test_concurrent_first_use_loads_once(self, load_manifest, load_messages):
+        load_manifest.side_effect = lambda *args: time.sleep(0.01)
+        threads = [threading.Thread(target=self.content_loader.warm) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert load_manifest.call_count == 2
+
+    def test_warm_only_loads_the_given_frameworks(self, load_manifest, load_messages):
+        self.content_loader.warm(['g-cloud-8'])
+
+        load_manifest.assert_called_once_with('g-cloud-8', 'services', 'edit_service')
+        assert not load_messages.called
+
+
+@mock.patch.object(ContentLoader, 'get_manifest')
+class TestGetFilteredManifest(object):
+    def setup(self):
+        self.content_loader = LazyContentLoader('app/content')
+        self.content = mock.Mock(sections=[
+            mock.Mock(questions=[
+                {'id': 'serviceName'},
+                {'id': 'pricing', 'questions': [{'id': 'price', 'depends': [{'on': 'lot', 'being': ['saas']}]}]},
+            ]),
+        ])
+        self.content.filter.side_effect = lambda context: mock.Mock(lot=context.get('lot'))
+
+    def test_drafts_with_the_same_depended_on_fields_share_a_filtered_manifest(self, get_manifest):
+        get_manifest.return_value = self.content
+        first = self.content_loader.get_filtered_manifest('g-cloud-7', 'edit_submission', {'lot': 'saas', 'id': 1})
+        second = self.content_loader.get_filtered_manifest('g-cloud-7', 'edit_submission', {'lot': 'saas', 'id': 2})
+
+        assert first is second
+        self.content.filter.assert_called_once_with({'lot': 'saas', 'id': 1})
+
+    def test_drafts_with_different_depended_on_fields_are_filtered_separately(self, get_manifest):
+        get_manifest.return_value = self.content
+        saas = self.content_loader.get_filtered_manifest('g-cloud-7', 'edit_submission', {'lot': 'saas'})
+        paas = self.content_loader.get_filtered_manifest('g-cloud-7', 'edit_submission', {'lot': 'paas'})
+
+        assert (saas.lot, paas.lot) == ('saas', 'paas')
+
+    def test_cache_is_bounded(self, get_manifest):
+        get_manifest.return_value = self.content
+        with mock.patch('app.main.helpers.content.FILTER_CACHE_SIZE', 2):
+            for lot in ['saas', 'paas', 'iaas', 'saas']:
+                self.content_loader.get_filtered_manifest('g-cloud-7', 'edit_submission', {'lot': lot})
+
+        assert self.content.filter.call_count == 4
@@ -4,7 +4,14 @@ import mock
 from nose.tools import assert_equal
 from werkzeug.exceptions import HTTPException
 
-from app.main.helpers.frameworks import get_statuses_for_lot, return_supplier_framework_info_if_on_framework_or_abort
+from app import cache
+from app.main.helpers.frameworks import (
+    frameworks_by_slug, get_framework, get_framework_and_lot, get_statuses_for_lot, invalidate_framework_cache,
+    return_supplier_framework_info_if_on_framework_or_abort, countersigned_framework_agreement_exists_in_bucket,
+    get_framework_id, get_framework_lot, get_supplier_framework_ids
+)
+
+from ...helpers import BaseApplicationTest
 
 
 def get_lot_status_examples():
@@ -331,3 +338,144 @@ def test_return_supplier_framework_info_if_on_framework_or_abort_returns_supplie
     data_api_client.get_supplier_framework_info.return_value = supplier_framework_response
     assert return_supplier_framework_info_if_on_framework_or_abort(data_api_client, 'g-cloud-8') == \
         supplier_framework_response['frameworkInterest']
+
+
+class TestFrameworkCache(BaseApplicationTest):
+    cache_type = 'simple'
+
+    def setup(self):
+        super(TestFrameworkCache, self).setup()
+        self.client_mock = mock.Mock()
+        self.client_mock.get_framework.return_value = BaseApplicationTest.framework(status='open')
+
+    def test_framework_is_only_fetched_once(self):
+        with self.app.app_context():
+            get_framework(self.client_mock, 'g-cloud-7')
+            framework = get_framework(self.client_mock, 'g-cloud-7')
+
+        assert framework['slug'] == 'g-cloud-7'
+        self.client_mock.get_framework.assert_called_once_with('g-cloud-7')
+
+    def test_cached_framework_still_checks_allowed_statuses(self):
+        with self.app.app_context():
+            get_framework(self.client_mock, 'g-cloud-7')
+            with pytest.raises(HTTPException):
+                get_framework(self.client_mock, 'g-cloud-7', allowed_statuses=['live'])
+
+    def test_framework_that_has_moved_on_is_fetched_again(self):
+        with self.app.app_context():
+            get_framework(self.client_mock, 'g-cloud-7')
+            self.client_mock.get_framework.return_value = BaseApplicationTest.framework(status='live')
+            framework = get_framework(self.client_mock, 'g-cloud-7', allowed_statuses=['live'])
+            get_framework(self.client_mock, 'g-cloud-7', allowed_statuses=['live'])
+
+        assert framework['status'] == 'live'
+        assert self.client_mock.get_framework.call_count == 2
+
+    def test_framework_listing_drops_frameworks_whose_status_changed(self):
+        self.client_mock.find_frameworks.return_value = {
+            'frameworks': [BaseApplicationTest.framework(status='pending')['frameworks']]
+        }
+        with self.app.app_context():
+            get_framework(self.client_mock, 'g-cloud-7')
+            frameworks_by_slug(self.client_mock)
+            self.client_mock.get_framework.return_value = BaseApplicationTest.framework(status='pending')
+            framework = get_framework(self.client_mock, 'g-cloud-7')
+
+        assert framework['status'] == 'pending'
+        assert self.client_mock.get_framework.call_count == 2
+
+    def test_open_only_callers_always_fetch_the_framework(self):
+        with self.app.app_context():
+            get_framework(self.client_mock, 'g-cloud-7', allowed_statuses=['open'])
+            self.client_mock.get_framework.return_value = BaseApplicationTest.framework(status='pending')
+            with pytest.raises(HTTPException):
+                get_framework(self.client_mock, 'g-cloud-7', allowed_statuses=['open'])
+
+        assert self.client_mock.get_framework.call_count == 2
+
+    def test_lot_is_looked_up_from_cached_index(self):
+        with self.app.app_context():
+            get_framework(self.client_mock, 'g-cloud-7')
+            framework, lot = get_framework_and_lot(self.client_mock, 'g-cloud-7', 'scs')
+
+        assert lot['name'] == 'Specialist Cloud Services'
+        self.client_mock.get_framework.assert_called_once_with('g-cloud-7')
+
+    def test_lot_comes_from_the_framework_given(self):
+        framework = BaseApplicationTest.framework(status='open')['frameworks']
+        framework['lots'] = [{'slug': 'scs', 'name': 'Renamed lot'}]
+        with self.app.app_context():
+            get_framework(self.client_mock, 'g-cloud-7')
+
+            assert get_framework_lot(framework, 'scs')['name'] == 'Renamed lot'
+
+    def test_unknown_lot_aborts(self):
+        with self.app.app_context():
+            with pytest.raises(HTTPException):
+                get_framework_and_lot(self.client_mock, 'g-cloud-7', 'not-a-lot')
+
+    def test_invalidate_framework_cache(self):
+        with self.app.app_context():
+            get_framework(self.client_mock, 'g-cloud-7')
+            invalidate_framework_cache('g-cloud-7')
+            get_framework(self.client_mock, 'g-cloud-7')
+
+        assert self.client_mock.get_framework.call_count == 2
+
+
+class TestFrameworkRegistry(BaseApplicationTest):
+    cache_type = 'simple'
+
+    def setup(self):
+        super(TestFrameworkRegistry, self).setup()
+        self.client_mock = mock.Mock()
+        self.client_mock.get_framework.side_effect = lambda slug: {
+            'frameworks': {'slug': slug, 'id': {'digital-marketplace': 7, 'g-cloud-7': 4}[slug]}
+        }
+
+    def test_framework_id_is_only_fetched_once(self):
+        with self.app.app_context():
+            assert get_framework_id(self.client_mock, 'digital-marketplace') == 7
+            assert get_framework_id(self.client_mock, 'digital-marketplace') == 7
+
+        self.client_mock.get_framework.assert_called_once_with('digital-marketplace')
+
+    def test_new_slugs_are_added_to_the_registry(self):
+        with self.app.app_context():
+            get_framework_id(self.client_mock, 'digital-marketplace')
+            assert get_framework_id(self.client_mock, 'g-cloud-7') == 4
+            get_framework_id(self.client_mock, 'digital-marketplace')
+
+        assert self.client_mock.get_framework.call_count == 2
+
+    def test_supplier_framework_ids(self):
+        supplier = {'frameworks': [{'framework_id': 7}, {'framework_id': 4}]}
+
+        assert get_supplier_framework_ids(supplier) == frozenset([4, 7])
+        assert get_supplier_framework_ids({}) == frozenset()
+
+
+@mock.patch('app.main.helpers.frameworks.current_user', mock.Mock(supplier_code=1234))
+@mock.patch('dmutils.s3.S3')
+class TestCountersignedAgreementCache(BaseApplicationTest):
+    cache_type = 'simple'
+
+    def test_countersigned_agreement_is_remembered(self, s3):
+        s3.return_value.path_exists.return_value = True
+        with self.app.app_context():
+            assert countersigned_framework_agreement_exists_in_bucket('g-cloud-8', 'agreements-bucket')
+            assert countersigned_framework_agreement_exists_in_bucket('g-cloud-8', 'agreements-bucket')
+
+        s3.assert_called_once_with('agreements-bucket')
+        assert s3.return_value.path_exists.call_count == 1
+
+    def test_missing_agreement_is_remembered_for_the_shorter_timeout(self, s3):
+        s3.return_value.path_exists.return_value = False
+        with self.app.app_context(), mock.patch.object(cache, 'set') as cache_set:
+            assert not countersigned_framework_agreement_exists_in_bucket('g-cloud-8', 'agreements-bucket')
+
+        cache_set.assert_called_once_with(
+            'countersigned-agreement:g-cloud-8:1234', False,
+            timeout=self.app.config['DM_COUNTERSIGNED_AGREEMENT_NEGATIVE_CACHE_TIMEOUT']
+        )
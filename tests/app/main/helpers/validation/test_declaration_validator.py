@@ -0,0 +1,98 @@
+import mock
+from werkzeug.datastructures import ImmutableOrderedMultiDict
+
+from app.main.helpers.validation import DeclarationValidator, get_field_table
+
+QUESTIONS = {
+    'name': {'type': 'text', 'number': 1},
+    'email': {
+        'type': 'text', 'question': 'Email address',
+        'validations': [{'name': 'invalid_format', 'message': 'Enter an email address.'}],
+    },
+    'agree': {'type': 'boolean', 'number': 3},
+}
+
+
+class FakeContent(object):
+    def __init__(self):
+        self.sections = [
+            mock.Mock(**{'get_question_ids.return_value': ['name', 'email']}),
+            mock.Mock(**{'get_question_ids.return_value': ['agree']}),
+        ]
+        self.get_question = mock.Mock(side_effect=QUESTIONS.get)
+
+    def __iter__(self):
+        return iter(self.sections)
+
+
+class LimitedValidator(DeclarationValidator):
+    character_limit = 20
+    email_validation_fields = set(['email'])
+
+
+def test_field_table_is_built_once_per_manifest():
+    content = FakeContent()
+    table = get_field_table(content)
+
+    assert get_field_table(content) is table
+    assert table.ids == ['name', 'email', 'agree']
+    assert table.character_limited_ids == ['name', 'email']
+    assert content.get_question.call_count == 3
+
+
+def test_validators_share_the_field_table():
+    content = FakeContent()
+    LimitedValidator(content, {}).get_error_messages()
+    LimitedValidator(content, {'name': 'A name that is far too long'}).get_error_messages()
+
+    assert content.get_question.call_count == 3
+
+
+def test_error_messages_use_question_numbers_and_validation_messages():
+    validator = LimitedValidator(FakeContent(), {'name': 'A name that is far too long', 'email': 'not-an-email'})
+
+    assert validator.get_error_messages() == [
+        ('name', {
+            'input_name': 'name',
+            'question': 'Question 1',
+            'message': 'Your answer must be no more than 20 characters.',
+        }),
+        ('email', {
+            'input_name': 'email',
+            'question': 'Email address',
+            'message': 'Enter an email address.',
+        }),
+        ('agree', {
+            'input_name': 'agree',
+            'question': 'Question 3',
+            'message': 'You need to answer this question.',
+        }),
+    ]
+
+
+def test_validate_page_returns_page_errors_and_completeness():
+    validator = LimitedValidator(FakeContent(), {'name': 'Name', 'email': 'not-an-email'})
+    section = mock.Mock(**{'get_question_ids.return_value': ['name', 'email']})
+
+    errors, complete = validator.validate_page(section)
+
+    assert list(errors.keys()) == ['email']
+    assert not complete
+
+
+def test_validate_page_for_a_complete_declaration():
+    validator = LimitedValidator(FakeContent(), {'name': 'Name', 'email': 'me@example.com', 'agree': True})
+    section = mock.Mock(**{'get_question_ids.return_value': ['name', 'email']})
+
+    assert validator.validate_page(section) == (ImmutableOrderedMultiDict(), True)
+
+
+def test_number_string_patterns_are_compiled_once_per_class():
+    class NumberValidator(DeclarationValidator):
+        number_string_fields = [('dunsNumber', 9)]
+
+    patterns = NumberValidator.number_string_patterns()
+
+    assert NumberValidator.number_string_patterns() is patterns
+    assert patterns[0][1].match('123456789')
+    assert DeclarationValidator.number_string_patterns() == []
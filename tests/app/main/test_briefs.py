@@ -420,9 +420,7 @@ class TestRespondToBrief(BaseApplicationTest):
         data_api_client.get_framework.return_value = self.framework
         data_api_client.get_supplier.return_value = self.supplier
         data_api_client.get_application.return_value = self.application
-        data_api_client.req.suppliers().get.return_value = {
-            'supplier': {'domains': {}}
-        }
+        self.supplier['supplier']['domains'] = {'legacy': [], 'assessed': [], 'unassessed': []}
         res = self.client.get(self.url_for('main.brief_response', brief_id=1234))
 
         assert res.status_code == 400
@@ -436,9 +434,7 @@ class TestRespondToBrief(BaseApplicationTest):
         data_api_client.get_framework.return_value = self.framework
         data_api_client.get_supplier.return_value = self.supplier
         data_api_client.get_application.return_value = self.application
-        data_api_client.req.suppliers().get.return_value = {
-            'supplier': {'domains': {}}
-        }
+        self.supplier['supplier']['domains'] = {'legacy': [], 'assessed': [], 'unassessed': []}
         res = self.client.get(self.url_for('main.brief_response', brief_id=1234))
 
         assert res.status_code == 302
@@ -453,9 +449,7 @@ class TestRespondToBrief(BaseApplicationTest):
         data_api_client.get_framework.return_value = self.framework
         data_api_client.get_supplier.return_value = self.supplier
         data_api_client.get_application.return_value = self.application
-        data_api_client.req.suppliers().get.return_value = {
-            'supplier': {'domains': {'unassessed': ['Data Science'], 'assessed': []}}
-        }
+        self.supplier['supplier']['domains'] = {'legacy': [], 'assessed': [], 'unassessed': ['Data Science']}
         res = self.client.get(self.url_for('main.brief_response', brief_id=1234))
 
         assert res.status_code == 302
@@ -690,7 +684,6 @@ class TestCreateResponseToBrief(BaseApplicationTest):
 
 
 @mock.patch("app.main.views.briefs.is_supplier_not_eligible_for_brief")
-@mock.patch("app.main.views.briefs.get_brief")
 @mock.patch("app.main.views.briefs.data_api_client")
 class TestResponseResultPage(BaseApplicationTest):
 
@@ -707,8 +700,8 @@ class TestResponseResultPage(BaseApplicationTest):
             self.login(application_id=1)
 
     def test_view_response_result_submitted_ok(
-            self, data_api_client, get_brief, is_supplier_not_eligible_for_brief):
-        get_brief.return_value = self.brief['briefs']
+            self, data_api_client, is_supplier_not_eligible_for_brief):
+        data_api_client.get_brief.return_value = self.brief
         data_api_client.get_framework.return_value = self.framework
         is_supplier_not_eligible_for_brief.return_value = False
         data_api_client.find_brief_responses.return_value = {
@@ -724,8 +717,8 @@ class TestResponseResultPage(BaseApplicationTest):
             "Thanks for your application. You've now applied for ‘I need a thing to do a thing’"
 
     def test_view_response_result_submitted_unsuccessful(
-            self, data_api_client, get_brief, is_supplier_not_eligible_for_brief):
-        get_brief.return_value = self.brief['briefs']
+            self, data_api_client, is_supplier_not_eligible_for_brief):
+        data_api_client.get_brief.return_value = self.brief
         data_api_client.get_framework.return_value = self.framework
         is_supplier_not_eligible_for_brief.return_value = False
         data_api_client.find_brief_responses.return_value = {
@@ -740,9 +733,8 @@ class TestResponseResultPage(BaseApplicationTest):
         assert doc.xpath('//h1')[0].text.strip() == "You don’t meet all the essential requirements"
 
     def test_view_response_result_not_submitted_redirect_to_submit_page(
-            self, data_api_client, get_brief, is_supplier_not_eligible_for_brief):
+            self, data_api_client, is_supplier_not_eligible_for_brief):
         data_api_client.get_brief.return_value = self.brief
-        get_brief.return_value = self.brief['briefs']
         is_supplier_not_eligible_for_brief.return_value = False
         data_api_client.find_brief_responses.return_value = {"briefResponses": []}
         res = self.client.get(self.url_for('main.view_response_result', brief_id=1234))
@@ -751,9 +743,8 @@ class TestResponseResultPage(BaseApplicationTest):
         assert res.location == self.url_for('main.brief_response', brief_id=1234, _external=True)
 
     def test_nice_to_haves_heading_not_shown_when_there_are_none(
-            self, data_api_client, get_brief, is_supplier_not_eligible_for_brief):
+            self, data_api_client, is_supplier_not_eligible_for_brief):
         data_api_client.get_brief.return_value = self.brief
-        get_brief.return_value = self.brief['briefs']
         data_api_client.get_framework.return_value = self.framework
         is_supplier_not_eligible_for_brief.return_value = False
         data_api_client.find_brief_responses.return_value = {
@@ -770,11 +761,10 @@ class TestResponseResultPage(BaseApplicationTest):
         ) == 0
 
     def test_evaluation_methods_load_default_value(
-            self, data_api_client, get_brief, is_supplier_not_eligible_for_brief):
+            self, data_api_client, is_supplier_not_eligible_for_brief):
         no_extra_eval_brief = self.brief.copy()
         no_extra_eval_brief['briefs'].pop('evaluationType')
         data_api_client.get_brief.return_value = no_extra_eval_brief
-        get_brief.return_value = no_extra_eval_brief['briefs']
         data_api_client.get_framework.return_value = self.framework
         is_supplier_not_eligible_for_brief.return_value = False
         data_api_client.find_brief_responses.return_value = {
@@ -789,9 +779,8 @@ class TestResponseResultPage(BaseApplicationTest):
         assert len(doc.xpath('//li[contains(normalize-space(text()), "work history")]')) == 1
 
     def test_evaluation_methods_shown_with_a_or_an(
-            self, data_api_client, get_brief, is_supplier_not_eligible_for_brief):
+            self, data_api_client, is_supplier_not_eligible_for_brief):
         data_api_client.get_brief.return_value = self.brief
-        get_brief.return_value = self.brief['briefs']
         data_api_client.get_framework.return_value = self.framework
         is_supplier_not_eligible_for_brief.return_value = False
         data_api_client.find_brief_responses.return_value = {
@@ -806,9 +795,8 @@ class TestResponseResultPage(BaseApplicationTest):
         assert len(doc.xpath('//li[contains(normalize-space(text()), "a meeting")]')) == 1
 
     def test_evaluation_methods_grouped_into_meeting(
-            self, data_api_client, get_brief, is_supplier_not_eligible_for_brief):
+            self, data_api_client, is_supplier_not_eligible_for_brief):
         data_api_client.get_brief.return_value = self.brief
-        get_brief.return_value = self.brief['briefs']
         data_api_client.get_framework.return_value = self.framework
         is_supplier_not_eligible_for_brief.return_value = False
         data_api_client.find_brief_responses.return_value = {
@@ -14,6 +14,7 @@ from dmutils.forms import FakeCsrf
 from dmutils.s3 import S3ResponseError
 import pytest
 
+from app.main.helpers.validation import PageValidation
 from ..helpers import BaseApplicationTest, FULL_G7_SUBMISSION, FakeMail, csrf_only_request
 
 
@@ -99,8 +100,8 @@ class TestFrameworksDashboard(BaseApplicationTest):
 
         assert_equal(res.status_code, 404)
 
-    @mock.patch('app.main.views.frameworks.send_email')
-    def test_interest_registered_in_framework_on_post(self, send_email, data_api_client, s3):
+    @mock.patch('app.main.views.frameworks.send_bulk_email')
+    def test_interest_registered_in_framework_on_post(self, send_bulk_email, data_api_client, s3):
         with self.app.test_client():
             self.login()
 
@@ -118,8 +119,8 @@ class TestFrameworksDashboard(BaseApplicationTest):
                 "email@email.com"
             )
 
-    @mock.patch('app.main.views.frameworks.send_email')
-    def test_email_sent_when_interest_registered_in_framework(self, send_email, data_api_client, s3):
+    @mock.patch('app.main.views.frameworks.send_bulk_email')
+    def test_email_sent_when_interest_registered_in_framework(self, send_bulk_email, data_api_client, s3):
         with self.app.test_client():
             self.login()
 
@@ -136,9 +137,9 @@ class TestFrameworksDashboard(BaseApplicationTest):
             )
 
             assert_equal(res.status_code, 200)
-            send_email.assert_called_once_with(
-                ['email1', 'email2'],
-                mock.ANY,
+            send_bulk_email.assert_called_once_with(
+                [('email1', {}), ('email2', {})],
+                'emails/digital-outcomes-and-specialists_application_started.html',
                 'You have started your G-Cloud 7 application',
                 self.app.config['CLARIFICATION_EMAIL_FROM'],
                 'Digital Marketplace Admin',
@@ -1099,8 +1100,8 @@ class TestSupplierDeclaration(BaseApplicationTest):
 
             assert_equal(res.status_code, 400)
 
-    @mock.patch('app.main.helpers.validation.G7Validator.get_error_messages_for_page')
-    def test_post_with_validation_errors(self, get_error_messages_for_page, data_api_client):
+    @mock.patch('app.main.helpers.validation.G7Validator.validate_page')
+    def test_post_with_validation_errors(self, validate_page, data_api_client):
         """Test that answers are not saved if there are errors
 
         For unit tests of the validation see :mod:`tests.app.main.helpers.test_frameworks`
@@ -1109,7 +1110,9 @@ class TestSupplierDeclaration(BaseApplicationTest):
             self.login()
 
             data_api_client.get_framework.return_value = self.framework(status='open')
-            get_error_messages_for_page.return_value = {'PR1': {'input_name': 'PR1', 'message': 'this is invalid'}}
+            validate_page.return_value = PageValidation(
+                {'PR1': {'input_name': 'PR1', 'message': 'this is invalid'}}, complete=False
+            )
 
             res = self.client.post(
                 self.url_for('main.framework_supplier_declaration',
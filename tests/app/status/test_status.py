@@ -1,19 +1,23 @@
 import json
+import time
+from collections import OrderedDict
 from ..helpers import BaseApplicationTest
 
 import mock
+from dmapiclient import APIError
+from app.status.monitor import StatusMonitor, default_checks, get_monitor, init_app
 from nose.tools import assert_equal, assert_in, assert_false
 
 
 class TestStatus(BaseApplicationTest):
 
-    @mock.patch('app.status.views.data_api_client')
+    @mock.patch('app.status.monitor.data_api_client')
     def test_should_return_200_from_elb_status_check(self, data_api_client):
         status_response = self.client.get(self.url_for('status.status') + '?ignore-dependencies')
         assert_equal(200, status_response.status_code)
         assert_false(data_api_client.called)
 
-    @mock.patch('app.status.views.data_api_client')
+    @mock.patch('app.status.monitor.data_api_client')
     def test_status_ok(self, data_api_client):
         data_api_client.get_status.return_value = {
             "status": "ok"
@@ -28,7 +32,7 @@ class TestStatus(BaseApplicationTest):
         assert_equal(
             "ok", "{}".format(json_data['api_status']['status']))
 
-    @mock.patch('app.status.views.data_api_client')
+    @mock.patch('app.status.monitor.data_api_client')
     def test_status_error(self, data_api_client):
 
         data_api_client.get_status.return_value = {
@@ -47,3 +51,143 @@ class TestStatus(BaseApplicationTest):
             "error", "{}".format(json_data['api_status']['status']))
         assert_in(
             "Error connecting to", "{}".format(json_data['message']))
+
+    @mock.patch('app.status.monitor.data_api_client')
+    def test_status_includes_render_service_stats(self, data_api_client):
+        data_api_client.get_status.return_value = {"status": "ok"}
+
+        status_response = self.client.get(self.url_for('status.status'))
+
+        json_data = json.loads(status_response.get_data().decode('utf-8'))
+        assert_equal(json_data['render_service']['cache'], {'size': 0, 'hits': 0, 'misses': 0})
+        assert_in('pool', json_data['render_service'])
+
+    @mock.patch('app.status.monitor.data_api_client')
+    def test_status_lists_dependencies_with_latency(self, data_api_client):
+        data_api_client.get_status.return_value = {"status": "ok"}
+
+        status_response = self.client.get(self.url_for('status.status'))
+
+        json_data = json.loads(status_response.get_data().decode('utf-8'))
+        assert_equal(json_data['dependencies'].keys(), ['data_api'])
+        assert_equal(json_data['dependencies']['data_api']['status'], 'ok')
+        assert_in('latency_ms', json_data['dependencies']['data_api'])
+
+    @mock.patch('app.status.monitor.data_api_client')
+    def test_status_error_when_api_cannot_be_reached(self, data_api_client):
+        data_api_client.get_status.side_effect = APIError()
+
+        status_response = self.client.get(self.url_for('status.status'))
+
+        assert_equal(500, status_response.status_code)
+        json_data = json.loads(status_response.get_data().decode('utf-8'))
+        assert_equal(json_data['dependencies']['data_api']['status'], 'error')
+
+    @mock.patch('app.status.monitor.data_api_client')
+    def test_status_error_when_snapshot_is_stale(self, data_api_client):
+        data_api_client.get_status.return_value = {"status": "ok"}
+        self.app.config['DM_STATUS_REFRESH_INTERVAL'] = 15
+        with self.app.app_context():
+            monitor = get_monitor()
+        monitor._snapshot = ({'data_api': {'status': 'ok'}}, time.time() - 120)
+        monitor.start = mock.Mock()
+
+        status_response = self.client.get(self.url_for('status.status'))
+
+        assert_equal(500, status_response.status_code)
+        json_data = json.loads(status_response.get_data().decode('utf-8'))
+        assert_in("has not been checked", json_data['message'])
+        assert_false(data_api_client.get_status.called)
+
+    @mock.patch('app.status.monitor.data_api_client')
+    def test_first_status_request_waits_for_the_first_checks(self, data_api_client):
+        data_api_client.get_status.return_value = {"status": "ok"}
+        self.app.config['DM_STATUS_REFRESH_INTERVAL'] = 15
+        with self.app.app_context():
+            monitor = get_monitor()
+        monitor.start = mock.Mock()
+
+        status_response = self.client.get(self.url_for('status.status'))
+
+        assert_equal(200, status_response.status_code)
+        data_api_client.get_status.assert_called_once_with()
+
+    @mock.patch('app.status.monitor.data_api_client')
+    def test_status_ok_without_an_api_check(self, data_api_client):
+        self.app.config['DM_STATUS_CHECKS'] = []
+
+        status_response = self.client.get(self.url_for('status.status'))
+
+        assert_equal(200, status_response.status_code)
+        json_data = json.loads(status_response.get_data().decode('utf-8'))
+        assert_equal(json_data['api_status'], None)
+        assert_false(data_api_client.get_status.called)
+
+    @mock.patch('app.status.monitor.StatusMonitor.start')
+    def test_background_checks_start_with_the_first_request(self, start):
+        self.app.config['DM_STATUS_REFRESH_INTERVAL'] = 15
+
+        init_app(self.app)
+        assert_false(start.called)
+
+        self.client.get(self.url_for('status.status') + '?ignore-dependencies')
+        start.assert_called_once_with()
+
+    @mock.patch('app.status.monitor.get_bucket')
+    def test_bucket_checks_use_the_shared_buckets(self, get_bucket):
+        self.app.config.update(DM_STATUS_CHECKS=['s3'], DM_STATUS_CHECK_BUCKETS=['DM_AGREEMENTS_BUCKET'],
+                               DM_AGREEMENTS_BUCKET='agreements')
+        with self.app.app_context():
+            checks = default_checks(self.app.config)
+            checks['s3:agreements']()
+            checks['s3:agreements']()
+
+        assert_equal(get_bucket.call_args_list, [mock.call('agreements')] * 2)
+        assert_equal(get_bucket.return_value.path_exists.call_count, 2)
+
+
+class TestStatusMonitor(object):
+    def setup(self):
+        self.app = mock.Mock()
+        self.check = mock.Mock(return_value={'status': 'ok', 'version': '1'})
+
+    def test_checks_run_on_every_snapshot_without_a_refresh_interval(self):
+        monitor = StatusMonitor(self.app, OrderedDict([('api', self.check)]), 0)
+
+        monitor.snapshot()
+        dependencies, checked_at = monitor.snapshot()
+
+        assert_equal(self.check.call_count, 2)
+        assert_equal(dependencies['api']['version'], '1')
+
+    def test_snapshots_are_served_from_the_background_refresh(self):
+        monitor = StatusMonitor(self.app, OrderedDict([('api', self.check)]), 15)
+        monitor.start = mock.Mock()
+
+        monitor.snapshot()
+        dependencies, checked_at = monitor.snapshot()
+
+        assert_equal(dependencies['api']['version'], '1')
+        assert_equal(self.check.call_count, 1)
+        assert_equal(monitor.start.call_count, 2)
+
+    def test_the_first_checks_run_in_the_background(self):
+        monitor = StatusMonitor(mock.MagicMock(), OrderedDict([('api', self.check)]), 15)
+
+        monitor.start()
+        for _ in range(100):
+            if monitor._snapshot is not None:
+                break
+            time.sleep(0.01)
+
+        assert_equal(monitor._snapshot[0]['api']['status'], 'ok')
+        assert_equal(self.check.call_count, 1)
+
+    def test_failed_checks_are_recorded_as_errors(self):
+        monitor = StatusMonitor(self.app, OrderedDict([('redis', mock.Mock(side_effect=ValueError('refused')))]), 0)
+
+        dependencies, checked_at = monitor.snapshot()
+
+        assert_equal(dependencies['redis']['status'], 'error')
+        assert_equal(dependencies['redis']['message'], 'refused')
+        assert_in('latency_ms', dependencies['redis'])
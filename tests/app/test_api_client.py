@@ -0,0 +1,177 @@
+import mock
+import pytest
+from dmapiclient import HTTPError
+
+from app.api_client import DataAPIUnavailable, GuardedAPIClient, RequestCachedAPIClient
+
+from .helpers import BaseApplicationTest
+
+
+class TestRequestCachedAPIClient(BaseApplicationTest):
+    def setup(self):
+        super(TestRequestCachedAPIClient, self).setup()
+        self.client_mock = mock.Mock()
+        self.client_mock.get_framework.return_value = {'frameworks': {'slug': 'g-cloud-7'}}
+        self.api_client = RequestCachedAPIClient(self.client_mock)
+
+    def test_identical_reads_are_deduplicated_within_a_request(self):
+        with self.app.test_request_context('/'):
+            self.api_client.get_framework('g-cloud-7')
+            self.api_client.get_framework('g-cloud-7')
+
+        self.client_mock.get_framework.assert_called_once_with('g-cloud-7')
+
+    def test_reads_with_different_arguments_are_not_shared(self):
+        with self.app.test_request_context('/'):
+            self.api_client.get_framework('g-cloud-7')
+            self.api_client.get_framework('g-cloud-8')
+
+        assert self.client_mock.get_framework.call_count == 2
+
+    def test_cache_does_not_outlive_the_request(self):
+        with self.app.test_request_context('/'):
+            self.api_client.get_framework('g-cloud-7')
+        with self.app.test_request_context('/'):
+            self.api_client.get_framework('g-cloud-7')
+
+        assert self.client_mock.get_framework.call_count == 2
+
+    def test_writes_invalidate_cached_reads(self):
+        with self.app.test_request_context('/'):
+            self.api_client.get_framework('g-cloud-7')
+            self.api_client.register_framework_interest(1234, 'g-cloud-7', 'email@email.com')
+            self.api_client.get_framework('g-cloud-7')
+
+        assert self.client_mock.get_framework.call_count == 2
+        self.client_mock.register_framework_interest.assert_called_once_with(1234, 'g-cloud-7', 'email@email.com')
+
+    def test_private_helpers_keep_cached_reads(self):
+        with self.app.test_request_context('/'):
+            self.api_client.get_framework('g-cloud-7')
+            self.api_client._get('http://api/suppliers/invite-candidates?page=2')
+            self.api_client.get_framework('g-cloud-7')
+
+        self.client_mock.get_framework.assert_called_once_with('g-cloud-7')
+        self.client_mock._get.assert_called_once_with('http://api/suppliers/invite-candidates?page=2')
+
+    def test_request_builder_reads_keep_cached_reads(self):
+        with self.app.test_request_context('/'):
+            self.api_client.get_framework('g-cloud-7')
+            self.api_client.req.domain('Data science').get()
+            self.api_client.get_framework('g-cloud-7')
+
+        self.client_mock.get_framework.assert_called_once_with('g-cloud-7')
+        self.client_mock.req.domain.assert_called_once_with('Data science')
+        self.client_mock.req.domain.return_value.get.assert_called_once_with()
+
+    def test_request_builder_writes_invalidate_cached_reads(self):
+        with self.app.test_request_context('/'):
+            self.api_client.get_framework('g-cloud-7')
+            self.api_client.req.applications(1).submit().post(data={'user_id': 1})
+            self.api_client.get_framework('g-cloud-7')
+
+        assert self.client_mock.get_framework.call_count == 2
+        self.client_mock.req.applications.return_value.submit.return_value.post.assert_called_once_with(
+            data={'user_id': 1})
+
+    def test_cached_results_can_be_mutated_safely(self):
+        with self.app.test_request_context('/'):
+            framework = self.api_client.get_framework('g-cloud-7')['frameworks']
+            framework['slug'] = 'changed'
+
+            assert self.api_client.get_framework('g-cloud-7')['frameworks']['slug'] == 'g-cloud-7'
+
+    def test_reads_outside_a_request_are_not_cached(self):
+        with self.app.app_context():
+            self.api_client.get_framework('g-cloud-7')
+            self.api_client.get_framework('g-cloud-7')
+
+        assert self.client_mock.get_framework.call_count == 2
+
+    def test_cache_can_be_disabled(self):
+        self.app.config['DM_API_REQUEST_CACHE'] = False
+        with self.app.test_request_context('/'):
+            self.api_client.get_framework('g-cloud-7')
+            self.api_client.get_framework('g-cloud-7')
+
+        assert self.client_mock.get_framework.call_count == 2
+
+
+class TestGuardedAPIClient(BaseApplicationTest):
+    def setup(self):
+        super(TestGuardedAPIClient, self).setup()
+        self.app.config.update(
+            DM_API_MAX_CONCURRENT_CALLS=1,
+            DM_API_BULKHEAD_TIMEOUT=0,
+            DM_API_BREAKER_THRESHOLD=2,
+            DM_API_BREAKER_RESET_TIMEOUT=60,
+        )
+        self.client_mock = mock.Mock()
+        self.api_client = GuardedAPIClient(self.client_mock)
+        self.api_client.init_app(self.app)
+
+    def test_calls_are_passed_through(self):
+        self.client_mock.get_framework.return_value = {'frameworks': {'slug': 'g-cloud-7'}}
+
+        assert self.api_client.get_framework('g-cloud-7') == {'frameworks': {'slug': 'g-cloud-7'}}
+        self.client_mock.get_framework.assert_called_once_with('g-cloud-7')
+        self.client_mock.init_app.assert_called_once_with(self.app)
+
+    def test_server_errors_stop_further_calls(self):
+        self.client_mock.get_framework.side_effect = HTTPError(mock.Mock(status_code=500))
+
+        for _ in range(2):
+            with pytest.raises(HTTPError):
+                self.api_client.get_framework('g-cloud-7')
+        with pytest.raises(DataAPIUnavailable) as e:
+            self.api_client.get_supplier(1234)
+
+        assert e.value.status_code == 503
+        assert not self.client_mock.get_supplier.called
+
+    def test_client_errors_do_not_stop_further_calls(self):
+        self.client_mock.get_framework.side_effect = HTTPError(mock.Mock(status_code=404))
+
+        for _ in range(3):
+            with pytest.raises(HTTPError):
+                self.api_client.get_framework('g-cloud-7')
+
+        assert self.client_mock.get_framework.call_count == 3
+
+    def test_calls_over_the_concurrency_limit_fail_fast(self):
+        self.api_client.bulkhead.acquire()
+
+        with pytest.raises(DataAPIUnavailable):
+            self.api_client.get_framework('g-cloud-7')
+        assert not self.client_mock.get_framework.called
+
+        self.api_client.bulkhead.release()
+        self.api_client.get_framework('g-cloud-7')
+        assert self.client_mock.get_framework.called
+
+    def test_rejected_calls_do_not_count_as_api_failures(self):
+        self.api_client.bulkhead.acquire()
+        for _ in range(3):
+            with pytest.raises(DataAPIUnavailable):
+                self.api_client.get_framework('g-cloud-7')
+
+        assert self.api_client.breaker.state == 'closed'
+
+    def test_request_builder_calls_are_guarded(self):
+        self.client_mock.req.suppliers.return_value.application.return_value.get.return_value = {'application': {}}
+
+        assert self.api_client.req.suppliers(1234).application().get() == {'application': {}}
+
+        self.api_client.bulkhead.acquire()
+        with pytest.raises(DataAPIUnavailable):
+            self.api_client.req.suppliers(1234).application().post(data={})
+        assert not self.client_mock.req.suppliers.return_value.application.return_value.post.called
+
+    def test_request_builder_failures_stop_further_calls(self):
+        self.client_mock.req.applications.return_value.post.side_effect = HTTPError(mock.Mock(status_code=500))
+
+        for _ in range(2):
+            with pytest.raises(HTTPError):
+                self.api_client.req.applications().post({})
+
+        assert self.api_client.breaker.state == 'open'
@@ -0,0 +1,182 @@
+import json
+
+import mock
+import pytest
+import redis
+from dmutils.email import EmailError
+
+from app.emails import drain, send_bulk_email, send_email
+
+from .helpers import BaseApplicationTest
+
+
+class FakeRedis(object):
+    """Just enough of a Redis client for the outbox's list, set and key operations."""
+
+    def __init__(self):
+        self.lists = {}
+        self.sets = {}
+        self.values = {}
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def exists(self, key):
+        return key in self.values
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def sadd(self, key, value):
+        self.sets.setdefault(key, set()).add(value)
+
+    def srem(self, key, value):
+        self.sets.get(key, set()).discard(value)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+    def rpoplpush(self, source, destination):
+        if not self.lists.get(source):
+            return None
+        value = self.lists[source].pop()
+        self.lpush(destination, value)
+        return value
+
+    def lrem(self, key, count, value):
+        self.lists[key].remove(value)
+
+
+EMAIL_ARGS = (['me@example.com'], 'body', 'subject', 'from@example.com', 'From')
+
+
+class TestEmailOutbox(BaseApplicationTest):
+    def setup(self):
+        super(TestEmailOutbox, self).setup()
+        self.redis = self.app.extensions['redis'] = FakeRedis()
+
+    def _processing_lists(self):
+        return [messages for key, messages in self.redis.lists.items() if key.startswith('email-outbox:processing:')]
+
+    @mock.patch('dmutils.email.send_email')
+    def test_email_is_sent_directly_without_the_outbox(self, dmutils_send_email):
+        with self.app.app_context():
+            send_email(*EMAIL_ARGS, reply_to='reply@example.com')
+
+        dmutils_send_email.assert_called_once_with(*EMAIL_ARGS, reply_to='reply@example.com')
+        assert self.redis.lists == {}
+
+    @mock.patch('dmutils.email.send_email')
+    def test_email_is_queued_with_the_outbox(self, dmutils_send_email):
+        self.app.config['DM_EMAIL_OUTBOX'] = True
+        with self.app.app_context():
+            send_email(*EMAIL_ARGS, reply_to='reply@example.com')
+
+        assert not dmutils_send_email.called
+        message = json.loads(self.redis.lists['email-outbox'][0])
+        assert message['args'] == list(EMAIL_ARGS)
+        assert message['kwargs'] == {'reply_to': 'reply@example.com'}
+
+    def test_failing_to_queue_raises_email_error(self):
+        self.app.config['DM_EMAIL_OUTBOX'] = True
+        self.app.extensions['redis'] = mock.Mock(**{'lpush.side_effect': redis.ConnectionError('down')})
+        with self.app.app_context():
+            with pytest.raises(EmailError):
+                send_email(*EMAIL_ARGS)
+
+    @mock.patch('dmutils.email.send_email')
+    def test_drain_sends_queued_emails_in_order(self, dmutils_send_email):
+        self.app.config['DM_EMAIL_OUTBOX'] = True
+        with self.app.app_context():
+            send_email(['first@example.com'], 'body', 'subject', 'from@example.com', 'From')
+            send_email(['second@example.com'], 'body', 'subject', 'from@example.com', 'From')
+            drain(once=True)
+
+        assert [call[0][0] for call in dmutils_send_email.call_args_list] == [
+            ['first@example.com'], ['second@example.com']
+        ]
+        assert self.redis.lists['email-outbox'] == []
+        assert self._processing_lists() == [[]]
+
+    @mock.patch('backoff._sync.time.sleep', mock.Mock())
+    @mock.patch('dmutils.email.send_email')
+    def test_drain_retries_then_dead_letters_failing_emails(self, dmutils_send_email):
+        dmutils_send_email.side_effect = EmailError('provider down')
+        self.app.config.update(DM_EMAIL_OUTBOX=True, DM_EMAIL_OUTBOX_MAX_TRIES=3)
+        with self.app.app_context():
+            send_email(*EMAIL_ARGS)
+            drain(once=True)
+
+        assert dmutils_send_email.call_count == 3
+        assert len(self.redis.lists['email-outbox:dead']) == 1
+        assert self._processing_lists() == [[]]
+
+    @mock.patch('dmutils.email.send_email')
+    def test_drain_recovers_emails_left_by_a_worker_that_stopped(self, dmutils_send_email):
+        self.app.config['DM_EMAIL_OUTBOX'] = True
+        self.redis.sadd('email-outbox:workers', 'old-host:1')
+        with self.app.app_context():
+            send_email(*EMAIL_ARGS)
+            self.redis.rpoplpush('email-outbox', 'email-outbox:processing:old-host:1')
+            drain(once=True)
+
+        assert dmutils_send_email.call_count == 1
+        assert 'old-host:1' not in self.redis.smembers('email-outbox:workers')
+
+    @mock.patch('dmutils.email.send_email')
+    def test_drain_leaves_emails_another_worker_is_sending(self, dmutils_send_email):
+        self.app.config['DM_EMAIL_OUTBOX'] = True
+        self.redis.sadd('email-outbox:workers', 'other-host:1')
+        self.redis.set('email-outbox:heartbeat:other-host:1', '1')
+        with self.app.app_context():
+            send_email(*EMAIL_ARGS)
+            self.redis.rpoplpush('email-outbox', 'email-outbox:processing:other-host:1')
+            drain(once=True)
+
+        assert not dmutils_send_email.called
+        assert len(self.redis.lists['email-outbox:processing:other-host:1']) == 1
+
+    @mock.patch('dmutils.email.send_email')
+    def test_drain_stops_its_heartbeat_when_it_finishes(self, dmutils_send_email):
+        self.app.config['DM_EMAIL_OUTBOX'] = True
+        with self.app.app_context():
+            drain(once=True)
+
+        assert self.redis.values == {}
+        assert len(self.redis.smembers('email-outbox:workers')) == 1
+
+
+@mock.patch('app.emails.render_template')
+@mock.patch('app.emails.send_email')
+class TestSendBulkEmail(BaseApplicationTest):
+    def _send(self, recipients):
+        with self.app.app_context():
+            return send_bulk_email(recipients, 'emails/template.html', 'subject', 'from@example.com', 'From', ['tag'])
+
+    def test_template_is_rendered_once_per_distinct_context(self, send_email, render_template):
+        render_template.side_effect = lambda template_name, **context: 'body for {}'.format(context.get('name'))
+        self._send([('a@example.com', {}), ('b@example.com', {'name': 'B'}), ('c@example.com', {})])
+
+        assert render_template.call_count == 2
+        assert send_email.call_args_list == [
+            mock.call(['a@example.com', 'c@example.com'], 'body for None', 'subject', 'from@example.com', 'From',
+                      ['tag']),
+            mock.call(['b@example.com'], 'body for B', 'subject', 'from@example.com', 'From', ['tag']),
+        ]
+
+    def test_recipients_are_sent_in_batches(self, send_email, render_template):
+        self.app.config['DM_EMAIL_BATCH_SIZE'] = 2
+        self._send([('{}@example.com'.format(i), {}) for i in range(5)])
+
+        assert [len(call[0][0]) for call in send_email.call_args_list] == [2, 2, 1]
+
+    def test_failures_are_reported_per_recipient(self, send_email, render_template):
+        self.app.config['DM_EMAIL_BATCH_SIZE'] = 2
+        send_email.side_effect = [None, EmailError('rejected')]
+
+        failures = self._send([('a@example.com', {}), ('b@example.com', {}), ('c@example.com', {})])
+
+        assert failures == {'c@example.com': 'rejected'}
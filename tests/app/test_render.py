@@ -0,0 +1,187 @@
+import mock
+import requests
+from flask import render_template
+from react.exceptions import RenderServerError
+
+from app.render import ClientRenderedComponent, PooledRenderTransport, RenderCache, RenderTransport, render_component
+from app.resilience import CircuitBreaker
+
+from .helpers import BaseApplicationTest
+
+
+class TestRenderCache(object):
+    def setup(self):
+        self.now = 1000
+        self.cache = RenderCache(2, 60, clock=lambda: self.now)
+
+    def test_entries_expire_after_the_timeout(self):
+        self.cache.set('a', 'component')
+        self.now += 59
+        assert self.cache.get('a') == 'component'
+        self.now += 1
+        assert self.cache.get('a') is None
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.set('a', 'component a')
+        self.cache.set('b', 'component b')
+        self.cache.get('a')
+        self.cache.set('c', 'component c')
+
+        assert self.cache.get('b') is None
+        assert self.cache.get('a') == 'component a'
+        assert self.cache.get('c') == 'component c'
+
+    def test_size_zero_caches_nothing(self):
+        cache = RenderCache(0, 60)
+        cache.set('a', 'component')
+        assert cache.get('a') is None
+
+
+@mock.patch('app.render.react_render_component')
+class TestRenderComponent(BaseApplicationTest):
+    def setup(self):
+        super(TestRenderComponent, self).setup()
+        self.app.config['REACT_RENDER_CACHE_SIZE'] = 10
+        self.app.extensions['react_render_cache'] = RenderCache(10, 60)
+
+    def test_identical_renders_are_reused(self, react_render_component):
+        with self.app.app_context():
+            first = render_component('bundles/Widget.js', {'a': 1, 'b': {'c': None}})
+            second = render_component('bundles/Widget.js', {'b': {'c': None}, 'a': 1})
+
+        assert first is second
+        react_render_component.assert_called_once_with('bundles/Widget.js', {'a': 1, 'b': {'c': None}}, False)
+
+    def test_different_props_are_rendered_separately(self, react_render_component):
+        with self.app.app_context():
+            render_component('bundles/Widget.js', {'a': 1})
+            render_component('bundles/Widget.js', {'a': 2})
+            render_component('bundles/Widget.js', {'a': 2}, True)
+
+        assert react_render_component.call_count == 3
+
+    def test_a_new_bundle_version_is_rendered_again(self, react_render_component):
+        with self.app.app_context():
+            render_component('bundles/Widget.js', {'a': 1})
+            self.app.config['REACT_BUNDLE_VERSION'] = 'v2'
+            render_component('bundles/Widget.js', {'a': 1})
+
+        assert react_render_component.call_count == 2
+
+    def test_renders_with_request_headers_are_not_cached(self, react_render_component):
+        with self.app.app_context():
+            render_component('bundles/Widget.js', {'a': 1}, request_headers={'Cookie': 'x'})
+            render_component('bundles/Widget.js', {'a': 1}, request_headers={'Cookie': 'x'})
+
+        assert react_render_component.call_count == 2
+
+    def test_a_zero_size_cache_disables_caching(self, react_render_component):
+        with self.app.app_context():
+            self.app.extensions['react_render_cache'] = RenderCache(0, 60)
+            render_component('bundles/Widget.js', {'a': 1})
+            render_component('bundles/Widget.js', {'a': 1})
+
+        assert react_render_component.call_count == 2
+
+
+class TestRenderTransport(object):
+    @mock.patch('app.render.requests')
+    def test_posts_have_separate_timeouts(self, requests):
+        RenderTransport(1, 5).post('https://render', data='{}', timeout=30)
+
+        requests.post.assert_called_once_with('https://render', data='{}', timeout=(1, 5))
+
+
+class TestPooledRenderTransport(object):
+    def setup(self):
+        self.transport = PooledRenderTransport(4, 1, 5)
+
+    def test_posts_share_one_session_with_separate_timeouts(self):
+        with mock.patch.object(self.transport.session, 'post') as post:
+            self.transport.post('https://render', data='{}', timeout=30)
+            self.transport.post('https://render', data='{}')
+
+        assert post.call_args_list == [mock.call('https://render', data='{}', timeout=(1, 5))] * 2
+
+    def test_other_attributes_come_from_requests(self):
+        assert self.transport.ConnectionError is requests.ConnectionError
+
+    def test_stats(self):
+        self.transport.adapter.poolmanager.connection_from_url('https://render')
+
+        assert self.transport.stats() == {
+            'pool_size': 4,
+            'hosts': [{'host': 'render', 'connections_opened': 0, 'requests': 0, 'idle_connections': 4}],
+        }
+
+
+@mock.patch('app.render.react_render_component')
+class TestRenderFallback(BaseApplicationTest):
+    def setup(self):
+        super(TestRenderFallback, self).setup()
+        self.last_render = mock.Mock()
+        self.app.extensions['react_last_renders']['bundles/Widget.js'] = self.last_render
+
+    def test_falls_back_to_rendering_in_the_browser(self, react_render_component):
+        react_render_component.side_effect = RenderServerError('Could not connect to render server')
+
+        with self.app.app_context():
+            component = render_component('bundles/Widget.js', {'a': 1})
+
+        assert isinstance(component, ClientRenderedComponent)
+        assert str(component) == ''
+        assert component.get_props() == {'a': 1}
+        assert component.get_bundle() == self.last_render.get_bundle.return_value
+
+    def test_timeouts_fall_back_too(self, react_render_component):
+        react_render_component.side_effect = requests.ReadTimeout()
+
+        with self.app.app_context():
+            assert isinstance(render_component('bundles/Widget.js', {'a': 1}), ClientRenderedComponent)
+
+    def test_components_that_have_never_rendered_take_the_bundle_from_the_config(self, react_render_component):
+        react_render_component.side_effect = RenderServerError('Could not connect to render server')
+        self.app.config['REACT_BUNDLE_URL'] = 'https://frontend/bundle/'
+
+        with self.app.app_context():
+            component = render_component('bundles/Other.js', {'a': 1})
+
+            assert isinstance(component, ClientRenderedComponent)
+            assert component.get_bundle() == 'https://frontend/bundle/bundles/Other.js'
+            assert component.get_slug() == 'Other'
+
+    def test_fallback_components_can_be_rendered_by_the_react_templates(self, react_render_component):
+        react_render_component.side_effect = RenderServerError('Could not connect to render server')
+
+        with self.app.test_request_context('/'):
+            component = render_component('bundles/Other.js', {'a': 1})
+            html = render_template('_react.html', component=component)
+
+        assert 'id="react-bundle-Other-state"' in html
+        # the header's AuthWidget falls back too, and its assets come from react_assets.html
+        assert 'bundles/Header/AuthWidget.js' in html
+
+    def test_fallback_files_come_from_the_last_render(self, react_render_component):
+        react_render_component.side_effect = RenderServerError('Could not connect to render server')
+
+        with self.app.app_context():
+            component = render_component('bundles/Widget.js', {'a': 1})
+
+        assert component.get_file('stylesheet') == self.last_render.get_file.return_value
+        self.last_render.get_file.assert_called_once_with('stylesheet')
+
+    def test_successful_renders_are_remembered_for_falling_back(self, react_render_component):
+        with self.app.app_context():
+            component = render_component('bundles/Other.js', {'a': 1})
+
+        assert self.app.extensions['react_last_renders']['bundles/Other.js'] is component
+
+    def test_render_service_is_not_called_while_the_breaker_is_open(self, react_render_component):
+        self.app.extensions['react_render_breaker'] = CircuitBreaker(2, 30)
+        react_render_component.side_effect = RenderServerError('Could not connect to render server')
+
+        with self.app.app_context():
+            for _ in range(4):
+                assert isinstance(render_component('bundles/Widget.js', {'a': 1}), ClientRenderedComponent)
+
+        assert react_render_component.call_count == 2
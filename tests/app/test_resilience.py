@@ -0,0 +1,100 @@
+import threading
+
+import mock
+import pytest
+
+from app.resilience import Bulkhead, BulkheadFullError, CircuitBreaker, CircuitOpenError
+
+
+class TestCircuitBreaker(object):
+    def setup(self):
+        self.now = 1000
+        self.breaker = CircuitBreaker(2, 30, is_failure=lambda e: not isinstance(e, KeyError), clock=lambda: self.now)
+        self.failing = mock.Mock(side_effect=ValueError)
+
+    def fail(self, times):
+        for _ in range(times):
+            with pytest.raises(ValueError):
+                self.breaker.call(self.failing)
+
+    def test_opens_after_consecutive_failures(self):
+        self.fail(2)
+
+        assert self.breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            self.breaker.call(self.failing)
+        assert self.failing.call_count == 2
+
+    def test_a_success_resets_the_failure_count(self):
+        self.fail(1)
+        self.breaker.call(lambda: None)
+        self.fail(1)
+
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+    def test_exceptions_that_are_not_failures_do_not_open_it(self):
+        for _ in range(3):
+            with pytest.raises(KeyError):
+                self.breaker.call(mock.Mock(side_effect=KeyError))
+
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+    def test_a_successful_probe_closes_it(self):
+        self.fail(2)
+        self.now += 30
+
+        assert self.breaker.state == CircuitBreaker.HALF_OPEN
+        assert self.breaker.call(lambda: 'ok') == 'ok'
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+    def test_a_failed_probe_opens_it_again(self):
+        self.fail(2)
+        self.now += 30
+        self.fail(1)
+
+        assert self.breaker.state == CircuitBreaker.OPEN
+        self.now += 29
+        with pytest.raises(CircuitOpenError):
+            self.breaker.call(self.failing)
+
+    def test_only_one_probe_at_a_time(self):
+        self.fail(2)
+        self.now += 30
+
+        assert self.breaker.allow_request()
+        assert not self.breaker.allow_request()
+
+    def test_an_interrupted_probe_lets_another_through(self):
+        self.fail(2)
+        self.now += 30
+
+        with pytest.raises(KeyboardInterrupt):
+            self.breaker.call(mock.Mock(side_effect=KeyboardInterrupt))
+
+        assert self.breaker.call(lambda: 'ok') == 'ok'
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+
+class TestBulkhead(object):
+    def test_calls_over_the_limit_are_rejected(self):
+        bulkhead = Bulkhead(2, 0)
+        bulkhead.acquire()
+        bulkhead.acquire()
+
+        with pytest.raises(BulkheadFullError):
+            bulkhead.call(lambda: None)
+        assert bulkhead.stats() == {'max_concurrent': 2, 'in_flight': 2, 'rejected': 1}
+
+    def test_a_slot_is_freed_when_a_call_finishes(self):
+        bulkhead = Bulkhead(1, 0)
+
+        with pytest.raises(ValueError):
+            bulkhead.call(mock.Mock(side_effect=ValueError))
+        assert bulkhead.call(lambda: 'ok') == 'ok'
+
+    def test_waits_for_a_free_slot(self):
+        bulkhead = Bulkhead(1, 5)
+        bulkhead.acquire()
+        threading.Timer(0.05, bulkhead.release).start()
+
+        assert bulkhead.call(lambda: 'ok') == 'ok'
@@ -0,0 +1,178 @@
+import pickle
+
+import mock
+import pytest
+from flask import session
+from flask_kvsession import KVSessionExtension
+
+from app.sessions import SessionCodec, SessionInterface, SessionStore, TrackedSession
+
+from .helpers import BaseApplicationTest
+
+
+class FakeRedis(object):
+    """Just enough of a Redis client for the session store."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+        self.commands = []
+
+    def get(self, key):
+        self.commands.append('GET')
+        return self.values.get(key)
+
+    def expire(self, key, ttl):
+        self.commands.append('EXPIRE')
+        if key in self.values:
+            self.ttls[key] = ttl
+
+    def setex(self, key, ttl, value):
+        self.commands.append('SETEX')
+        self.values[key] = value
+        self.ttls[key] = ttl
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline(object):
+    def __init__(self, redis):
+        self.redis = redis
+        self.queued = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.queued.append((name, args))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args) for name, args in self.queued]
+
+
+class TestSessionStore(BaseApplicationTest):
+    def setup(self):
+        super(TestSessionStore, self).setup()
+        self.redis = FakeRedis()
+        self.store = SessionStore(self.redis, 3600)
+
+    def test_get_refreshes_the_ttl_in_the_same_round_trip(self):
+        self.redis.values['abc'] = b'data'
+        pipeline = mock.Mock(wraps=FakePipeline(self.redis))
+
+        with mock.patch.object(self.redis, 'pipeline', return_value=pipeline):
+            assert self.store.get('abc') == b'data'
+
+        pipeline.execute.assert_called_once_with()
+        assert self.redis.ttls == {'abc': 3600}
+
+    def test_get_missing_session(self):
+        with pytest.raises(KeyError):
+            self.store.get('abc')
+
+    def test_unchanged_session_is_not_written_back(self):
+        self.redis.values['abc'] = b'data'
+
+        with self.app.test_request_context('/'):
+            self.store.get('abc')
+            self.store.put('abc', b'data', 3600)
+
+        assert 'SETEX' not in self.redis.commands
+
+    def test_changed_session_is_written_back(self):
+        self.redis.values['abc'] = b'data'
+
+        with self.app.test_request_context('/'):
+            self.store.get('abc')
+            self.store.put('abc', b'new data', 3600)
+
+        assert self.redis.values['abc'] == b'new data'
+
+    def test_writes_outside_a_request_are_not_skipped(self):
+        self.redis.values['abc'] = b'data'
+        self.store.get('abc')
+        self.store.put('abc', b'data', 3600)
+
+        assert 'SETEX' in self.redis.commands
+
+    def test_one_redis_round_trip_for_a_request_that_does_not_change_the_session(self):
+        self.app.config['SESSION_COOKIE_SECURE'] = False
+        KVSessionExtension(self.store, self.app)
+
+        @self.app.route('/session-test/<value>')
+        def set_value(value):
+            session['value'] = value
+            return 'ok'
+
+        client = self.app.test_client()
+        client.get('/session-test/a')
+        self.redis.commands = []
+        client.get('/session-test/a')
+
+        assert self.redis.commands == ['GET', 'EXPIRE']
+
+    def test_sessions_are_stored_in_the_compact_format(self):
+        self.app.config['SESSION_COOKIE_SECURE'] = False
+        KVSessionExtension(self.store, self.app)
+        self.app.session_interface = SessionInterface()
+
+        @self.app.route('/session-test/<value>')
+        def set_value(value):
+            session['value'] = value
+            return session.get('previous', '')
+
+        client = self.app.test_client()
+        client.get('/session-test/a')
+        self.redis.commands = []
+        client.get('/session-test/a')
+
+        assert self.redis.values.values() == [b'\x01{"value":"a"}']
+        assert self.redis.commands == ['GET', 'EXPIRE']
+
+
+class TestSessionCodec(object):
+    def setup(self):
+        self.codec = SessionCodec()
+
+    def test_small_sessions_are_stored_as_json(self):
+        data = self.codec.dumps({'user_id': 1, '_flashes': [('message', 'Saved')]})
+
+        assert data == b'\x01{"_flashes":[{" t":["message","Saved"]}],"user_id":1}'
+        assert self.codec.loads(data) == {'user_id': 1, '_flashes': [('message', 'Saved')]}
+
+    def test_large_sessions_are_compressed(self):
+        session_data = {'contact_name': 'Kris Kringle' * 100}
+
+        data = self.codec.dumps(session_data)
+
+        assert data.startswith(b'\x02')
+        assert len(data) < 200
+        assert self.codec.loads(data) == session_data
+
+    def test_pickled_sessions_can_still_be_read(self):
+        assert self.codec.loads(pickle.dumps({'user_id': 1})) == {'user_id': 1}
+
+
+class TestTrackedSession(object):
+    def setup(self):
+        self.session = TrackedSession({'user_id': u'1', 'count': 1})
+
+    def test_assigning_the_same_value_does_not_modify_the_session(self):
+        self.session['user_id'] = '1'
+        self.session.update(count=1)
+
+        assert not self.session.modified
+
+    def test_assigning_a_different_value_modifies_the_session(self):
+        self.session['count'] = True
+
+        assert self.session.modified
+
+    def test_removing_a_key_modifies_the_session(self):
+        self.session.pop('count')
+
+        assert self.session.modified
+
+    def test_assigning_a_mutable_value_always_modifies_the_session(self):
+        session = TrackedSession({'form': {'name': 'a'}})
+        session['form'] = {'name': 'a'}
+
+        assert session.modified